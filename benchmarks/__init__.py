@@ -0,0 +1,4 @@
+"""
+Benchmarks for Jessica Core
+Reproducible load and micro benchmarks against local stand-ins for every upstream
+"""
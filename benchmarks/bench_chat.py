@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the Jessica Core request pipeline
+
+Starts fake upstreams (see fake_upstreams.py), runs jessica_core (or
+jessica_async) in a subprocess pointed at them, then drives /chat, /status
+and /api/proxy/* at each concurrency level. Reports p50/p95/p99 latency,
+throughput and the server's RSS, and writes everything to a JSON file so
+runs can be compared across commits.
+
+Usage:
+    python -m benchmarks.bench_chat --concurrency 1,8,32 --requests 200
+    python -m benchmarks.bench_chat --compare benchmarks/results/chat-abc1234.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmarks.fake_upstreams import Latency, start_fake_upstreams, upstream_env
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is optional
+    psutil = None
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# name -> (method, path, body factory taking a request counter)
+SCENARIOS = {
+    "chat_local": ("POST", "/chat", lambda i: {"message": f"hey, how is it going? ({i})", "provider": "local"}),
+    "chat_claude": ("POST", "/chat", lambda i: {"message": f"break down this plan ({i})", "provider": "claude"}),
+    "chat_grok": ("POST", "/chat", lambda i: {"message": f"latest news on the launch ({i})", "provider": "grok"}),
+    "chat_gemini": ("POST", "/chat", lambda i: {"message": f"summarize this document ({i})", "provider": "gemini"}),
+    "chat_auto": ("POST", "/chat", lambda i: {"message": f"research this for me ({i})", "provider": "auto"}),
+    "status": ("GET", "/status", None),
+    "proxy_claude": ("POST", "/api/proxy/claude", lambda i: {"message": f"hello ({i})"}),
+    "proxy_grok": ("POST", "/api/proxy/grok", lambda i: {"message": f"hello ({i})"}),
+    "proxy_gemini": ("POST", "/api/proxy/gemini", lambda i: {"message": f"hello ({i})"}),
+}
+
+# Rough production latencies (ms) for each upstream
+DEFAULT_LATENCY_MS = {
+    "ollama": 50,
+    "memory": 5,
+    "anthropic": 80,
+    "xai": 80,
+    "google": 60,
+    "letta": 30,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of a list of latencies in milliseconds"""
+    ordered = sorted(latencies_ms)
+    return {
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "mean": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "max": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def process_rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process (psutil, or /proc on Linux)"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class RSSSampler:
+    """Samples a process's RSS in the background and keeps the peak"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_rss_bytes(self.pid) or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class AppServer:
+    """jessica_core (werkzeug, threaded) or jessica_async (uvicorn) in a subprocess"""
+
+    def __init__(self, app: str, port: int, env: Dict[str, str]):
+        if app == "flask":
+            code = ("import jessica_core; from werkzeug.serving import run_simple; "
+                    f"run_simple('127.0.0.1', {port}, jessica_core.app, threaded=True)")
+            command = [sys.executable, "-c", code]
+        else:
+            command = [sys.executable, "-m", "uvicorn", "jessica_async:app",
+                       "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+        self.url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            command, cwd=REPO_ROOT, env={**os.environ, **env},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    def wait_ready(self, timeout: float = 60.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App server exited with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.url}/modes", timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"App server not ready after {timeout}s")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def run_load(base_url: str, scenario: str, concurrency: int, total: int) -> Tuple[List[float], int, float]:
+    """
+    Send `total` requests for one scenario with `concurrency` workers
+
+    Returns:
+        (latencies in ms, error count, wall-clock seconds)
+    """
+    method, path, body_factory = SCENARIOS[scenario]
+    counter = itertools.count()
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.mount("http://", HTTPAdapter(pool_maxsize=1))
+        return local.session
+
+    def one(_) -> Tuple[float, bool]:
+        body = body_factory(next(counter)) if body_factory else None
+        start = time.perf_counter()
+        try:
+            response = session().request(method, f"{base_url}{path}", json=body, timeout=120)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in outcomes], sum(1 for _, ok in outcomes if not ok), elapsed
+
+
+def git_revision() -> Dict[str, object]:
+    """Current commit and whether the tree has uncommitted changes"""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=REPO_ROOT, text=True).strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def compare(current: dict, baseline: dict):
+    """Print p50/p95/p99 and throughput changes against a previous results file"""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('git', {}).get('commit')} ({baseline.get('timestamp')})")
+    print(f"{'scenario':<14}{'conc':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}")
+    for result in current["results"]:
+        old = previous.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+
+        def delta(new_value, old_value):
+            return f"{(new_value - old_value) / old_value * 100:+.1f}%" if old_value else "n/a"
+
+        print(f"{result['scenario']:<14}{result['concurrency']:>5}"
+              f"{delta(result['latency_ms']['p50'], old['latency_ms']['p50']):>10}"
+              f"{delta(result['latency_ms']['p95'], old['latency_ms']['p95']):>10}"
+              f"{delta(result['latency_ms']['p99'], old['latency_ms']['p99']):>10}"
+              f"{delta(result['throughput_rps'], old['throughput_rps']):>10}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Jessica Core request pipeline")
+    parser.add_argument("--app", choices=["flask", "async"], default="flask")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per scenario before measuring")
+    parser.add_argument("--latency", action="append", default=[], metavar="UPSTREAM=MS",
+                        help="Override an upstream's mean latency, e.g. --latency ollama=200")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Jitter as a fraction of the mean latency")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for upstream latency jitter")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the app under test")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/chat-<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    latency_ms = dict(DEFAULT_LATENCY_MS)
+    for override in args.latency:
+        name, _, value = override.partition("=")
+        latency_ms[name] = float(value)
+    latencies = {name: Latency(ms, ms * args.jitter) for name, ms in latency_ms.items()}
+
+    upstreams = start_fake_upstreams(latencies, seed=args.seed)
+    env = {
+        **upstream_env(upstreams),
+        # The benchmark measures the pipeline, not the rate limiter
+        "RATE_LIMIT_CHAT": "1000000 per minute",
+        "RATE_LIMIT_PROXY": "1000000 per minute",
+    }
+    server = AppServer(args.app, args.port, env)
+    results = []
+    try:
+        server.wait_ready()
+        for scenario in scenarios:
+            run_load(server.url, scenario, 1, args.warmup)
+            for concurrency in levels:
+                with RSSSampler(server.process.pid) as sampler:
+                    latencies_ms, errors, elapsed = run_load(server.url, scenario, concurrency, args.requests)
+                rss = process_rss_bytes(server.process.pid)
+                result = {
+                    "scenario": scenario,
+                    "endpoint": f"{SCENARIOS[scenario][0]} {SCENARIOS[scenario][1]}",
+                    "concurrency": concurrency,
+                    "requests": args.requests,
+                    "errors": errors,
+                    "duration_s": round(elapsed, 3),
+                    "throughput_rps": round(args.requests / elapsed, 2) if elapsed else 0.0,
+                    "latency_ms": summarize(latencies_ms),
+                    "rss_mb": round(rss / 2**20, 1) if rss else None,
+                    "peak_rss_mb": round(sampler.peak / 2**20, 1) if sampler.peak else None,
+                }
+                results.append(result)
+                print(f"{scenario:<14} c={concurrency:<4} p50={result['latency_ms']['p50']:>8.1f}ms "
+                      f"p95={result['latency_ms']['p95']:>8.1f}ms p99={result['latency_ms']['p99']:>8.1f}ms "
+                      f"{result['throughput_rps']:>8.1f} rps  errors={errors}  rss={result['rss_mb']}MB")
+    finally:
+        server.stop()
+        for upstream in upstreams.values():
+            upstream.stop()
+
+    git = git_revision()
+    report = {
+        "schema_version": 1,
+        "benchmark": "chat_pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": git,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "app": args.app,
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": levels,
+            "upstream_latency_ms": latency_ms,
+            "jitter": args.jitter,
+            "seed": args.seed,
+        },
+        "upstream_requests": {name: upstream.requests for name, upstream in upstreams.items()},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"chat-{git['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Logging throughput benchmark for Jessica Core
+
+Pushes LogRecords through JSONFormatter and a real file handler and reports
+records/second for every installed JSON encoder backend:
+
+    format[<encoder>]   JSONFormatter.format alone
+    direct[<encoder>]   logger.info -> FileHandler on the calling thread
+    queue[<encoder>]    logger.info -> NonBlockingQueueHandler (LOG_QUEUE=1);
+                        records/sec as seen by the caller, plus drained/sec
+                        until the listener has written everything
+
+Writes a JSON file comparable across commits (--compare).
+
+Usage:
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --records 50000 --compare benchmarks/results/logging-abc1234.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.bench_chat import RESULTS_DIR, git_revision
+from logging_config import JSON_ENCODERS, JSONFormatter, enable_queue_logging
+
+
+# Representative request-path lines: plain, with extras, and a long one
+MESSAGES = [
+    ("Request started: %s %s", ("POST", "/chat"), {}),
+    ("Ollama Generate API - Model: %s", ("jessica",), {"provider": "local", "duration_ms": 812.4}),
+    ("Auto-detected importance: %s -> Model: %s", ("normal", "jessica"), {"request_id": "a1b2c3d4"}),
+    ("Memory recall: %s", ("remembered " * 60,), {"local_memories": 3, "cloud_memories": 2}),
+]
+
+
+def _records(count: int) -> List[logging.LogRecord]:
+    records = []
+    for i in range(count):
+        msg, args, extra = MESSAGES[i % len(MESSAGES)]
+        record = logging.LogRecord("jessica_core", logging.INFO, __file__, 42, msg, args, None, func="chat")
+        record.__dict__.update(extra)
+        records.append(record)
+    return records
+
+
+def _logger(name: str, path: str, formatter: logging.Formatter) -> logging.Logger:
+    logger = logging.getLogger(f"bench_logging.{name}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    return logger
+
+
+def _log_all(logger: logging.Logger, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        msg, args, extra = MESSAGES[i % len(MESSAGES)]
+        logger.info(msg, *args, extra=extra)
+    return time.perf_counter() - start
+
+
+def _close(logger: logging.Logger):
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+
+def bench_format(encoder: str, count: int) -> Dict[str, float]:
+    formatter = JSONFormatter(encoder=JSON_ENCODERS[encoder])
+    records = _records(count)
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    elapsed = time.perf_counter() - start
+    return {"records_per_sec": round(count / elapsed, 1)}
+
+
+def bench_direct(encoder: str, count: int, workdir: str) -> Dict[str, float]:
+    logger = _logger(f"direct.{encoder}", os.path.join(workdir, f"direct-{encoder}.log"),
+                     JSONFormatter(encoder=JSON_ENCODERS[encoder]))
+    try:
+        elapsed = _log_all(logger, count)
+    finally:
+        _close(logger)
+    return {"records_per_sec": round(count / elapsed, 1)}
+
+
+def bench_queue(encoder: str, count: int, workdir: str) -> Dict[str, float]:
+    logger = _logger(f"queue.{encoder}", os.path.join(workdir, f"queue-{encoder}.log"),
+                     JSONFormatter(encoder=JSON_ENCODERS[encoder]))
+    queue_handler = enable_queue_logging(logger, max_queue_depth=count, sample_rates={})
+    try:
+        start = time.perf_counter()
+        elapsed = _log_all(logger, count)
+        queue_handler.close()
+        drained = time.perf_counter() - start
+        dropped = queue_handler.get_stats()["dropped"]
+    finally:
+        logger.removeHandler(queue_handler)
+        for handler in queue_handler.handlers:
+            handler.close()
+    return {
+        "records_per_sec": round(count / elapsed, 1),
+        "drained_records_per_sec": round(count / drained, 1),
+        "dropped": dropped,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """Print records/sec changes against a previous results file"""
+    previous = {r["name"]: r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('git', {}).get('commit')} ({baseline.get('timestamp')})")
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if old is None or not old["records_per_sec"]:
+            continue
+        change = (result["records_per_sec"] - old["records_per_sec"]) / old["records_per_sec"] * 100
+        print(f"{result['name']:<24}{result['records_per_sec']:>14,.0f} rec/s{change:>+9.1f}%")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Logging throughput benchmark for Jessica Core")
+    parser.add_argument("--records", type=int, default=20000, help="Records per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best is reported)")
+    parser.add_argument("--encoders", default=",".join(JSON_ENCODERS),
+                        help=f"Comma-separated encoder backends (installed: {', '.join(JSON_ENCODERS)})")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/logging-<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    encoders = [name for name in args.encoders.split(",") if name]
+
+    results: List[dict] = []
+    with tempfile.TemporaryDirectory(prefix="bench-logging-") as workdir:
+        for encoder in encoders:
+            runs = {
+                f"format[{encoder}]": lambda: bench_format(encoder, args.records),
+                f"direct[{encoder}]": lambda: bench_direct(encoder, args.records, workdir),
+                f"queue[{encoder}]": lambda: bench_queue(encoder, args.records, workdir),
+            }
+            for name, run in runs.items():
+                best = max((run() for _ in range(args.repeat)), key=lambda r: r["records_per_sec"])
+                results.append({"name": name, **best})
+                extra = (f"{best['drained_records_per_sec']:>14,.0f} drained/s"
+                         if "drained_records_per_sec" in best else "")
+                print(f"{name:<24}{best['records_per_sec']:>14,.0f} rec/s{extra}")
+
+    git = git_revision()
+    report = {
+        "schema_version": 1,
+        "benchmark": "logging",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": git,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"records": args.records, "repeat": args.repeat, "encoders": encoders},
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"logging-{git['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-request CPU work in /chat
+
+Covers routing (command parsing + keyword scans), memory-context building,
+system prompt assembly and JSONFormatter.format over a corpus of realistic
+messages, up to the 10,000-character limit. Reports ns/op and allocations
+(tracemalloc) and writes a JSON file comparable across commits.
+
+Usage:
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --filter routing --compare benchmarks/results/micro-abc1234.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.bench_chat import RESULTS_DIR, git_revision
+
+import chat_requests
+from command_parser import extract_command_intent
+from logging_config import JSONFormatter
+
+
+_FILLER_WORDS = (
+    "the morning was quiet and i walked the dog down by the river before the rain came in "
+    "my knee has been acting up again so i took it slow and stopped for coffee with a buddy "
+    "we talked about the old unit and who is doing what these days and it felt good to laugh "
+    "later i need to call the va about my appointment and sort out the paperwork for the truck"
+).split()
+
+
+def _filler(length: int, seed: int) -> str:
+    """Deterministic conversational text of about `length` characters"""
+    rng = random.Random(seed)
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(_FILLER_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+# Message corpus: routing cost depends on length and on where (if anywhere) a rule hits
+CORPUS = {
+    "short": "hey jessica, what's up?",
+    "explicit": "use claude for this one, i want a second opinion on the budget",
+    "natural": "can you look up the weather for the drive to camp lejeune tomorrow",
+    "medium": _filler(600, seed=1),
+    "long_nohit": _filler(10000, seed=2),
+    "long_tail_hit": _filler(9950, seed=3) + " summarize",
+}
+
+MEMORY_CONTEXT = {
+    "local": [f"User: {_filler(400, seed=10 + i)}\nJessica: {_filler(600, seed=20 + i)}" for i in range(3)],
+    "cloud": [_filler(300, seed=30 + i) for i in range(5)],
+}
+
+
+def _log_record(message: str) -> logging.LogRecord:
+    record = logging.LogRecord("jessica_core", logging.INFO, __file__, 42, message, None, None, func="chat")
+    record.request_id = "a1b2c3d4"
+    record.duration_ms = 1234.5
+    record.provider = "claude"
+    return record
+
+
+def build_benchmarks() -> Dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable"""
+    matcher = chat_requests.routing_matcher
+    benchmarks = {}
+
+    for name, message in CORPUS.items():
+        benchmarks[f"routing.match[{name}]"] = lambda m=message: matcher.match(m)
+        benchmarks[f"routing.extract_command_intent[{name}]"] = lambda m=message: extract_command_intent(m)
+        benchmarks[f"routing.route_message_memo_hit[{name}]"] = lambda m=message: chat_requests.route_message(m)
+        benchmarks[f"routing.importance[{name}]"] = (
+            lambda m=message: chat_requests.detect_conversation_importance(m)
+        )
+
+    benchmarks["context.memory_context_text[empty]"] = (
+        lambda: chat_requests.memory_context_text({"local": [], "cloud": []})
+    )
+    benchmarks["context.memory_context_text[full]"] = lambda: chat_requests.memory_context_text(MEMORY_CONTEXT)
+
+    for name in ("short", "long_tail_hit"):
+        message = CORPUS[name]
+        command_intent, routing = chat_requests.route_message(message)
+        for model in ("jessica", "dolphin-llama3:8b"):
+            benchmarks[f"prompt.assemble_chat_request[{name},{model}]"] = (
+                lambda m=message, ci=command_intent, r=routing, model=model:
+                chat_requests.assemble_chat_request(m, "PhyreBug", model, ci, r, MEMORY_CONTEXT)
+            )
+
+    formatter = JSONFormatter()
+    for name in ("short", "medium", "long_nohit"):
+        record = _log_record(CORPUS[name])
+        benchmarks[f"logging.json_formatter[{name}]"] = lambda r=record: formatter.format(r)
+
+    return benchmarks
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> Dict[str, float]:
+    """
+    Time and profile the allocations of one benchmark
+
+    Returns:
+        ns_per_op (best of `repeat` runs), ops_per_sec, alloc_bytes_per_op
+        (peak memory allocated during a single call) and retained_blocks_per_op
+        (memory blocks still alive afterwards - should be ~0)
+    """
+    func()  # warm caches (prompt files, memo, regex)
+
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time / repeat:
+            break
+        number *= 2
+    ns_per_op = min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+    tracemalloc.start()
+    try:
+        gc.collect()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        alloc_bytes = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    calls = 100
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(calls):
+        func()
+    gc.collect()
+    retained = (sys.getallocatedblocks() - blocks_before) / calls
+
+    return {
+        "ns_per_op": round(ns_per_op, 1),
+        "ops_per_sec": round(1e9 / ns_per_op, 1) if ns_per_op else None,
+        "alloc_bytes_per_op": alloc_bytes,
+        "retained_blocks_per_op": round(max(retained, 0.0), 2),
+        "loops": number,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    """Print ns/op and allocation changes against a previous results file"""
+    previous = {r["name"]: r for r in baseline["results"]}
+    print(f"\nvs {baseline.get('git', {}).get('commit')} ({baseline.get('timestamp')})")
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if old is None or not old["ns_per_op"]:
+            continue
+        speed = (result["ns_per_op"] - old["ns_per_op"]) / old["ns_per_op"] * 100
+        alloc = result["alloc_bytes_per_op"] - old["alloc_bytes_per_op"]
+        print(f"{result['name']:<62}{speed:>+9.1f}% ns/op{alloc:>+12,} B/op")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for Jessica Core hot paths")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds of timing per benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per benchmark (best is reported)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/micro-<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    benchmarks = {name: func for name, func in build_benchmarks().items() if args.filter in name}
+
+    # Keep the app's request logging out of the measurements
+    logging.disable(logging.CRITICAL)
+    results: List[dict] = []
+    try:
+        for name, func in benchmarks.items():
+            result = {"name": name, **measure(func, args.min_time, args.repeat)}
+            results.append(result)
+            print(f"{name:<62}{result['ns_per_op']:>14,.0f} ns/op"
+                  f"{result['alloc_bytes_per_op']:>12,} B/op{result['retained_blocks_per_op']:>8} retained")
+    finally:
+        logging.disable(logging.NOTSET)
+
+    git = git_revision()
+    report = {
+        "schema_version": 1,
+        "benchmark": "micro",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git": git,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+            "corpus_lengths": {name: len(message) for name, message in CORPUS.items()},
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"micro-{git['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Local stand-ins for Jessica Core's upstream services
+Fake Ollama, memory_server, Anthropic, xAI, Gemini and Letta servers with configurable latency
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+@dataclass
+class Latency:
+    """Per-request delay: uniformly distributed in mean_ms +/- jitter_ms"""
+    mean_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Delay in seconds for one request"""
+        delay_ms = self.mean_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, delay_ms) / 1000
+
+
+# A responder maps (method, path, json body) to (status, json response)
+Responder = Callable[[str, str, Optional[dict]], Tuple[int, object]]
+
+
+def _ollama(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path == "/api/tags":
+        return 200, {"models": [{"name": "jessica:latest"}, {"name": "dolphin-llama3:8b"}]}
+    if path == "/api/generate":
+        return 200, {"model": (body or {}).get("model"), "response": "Hey brother, local answer here.", "done": True}
+    return 404, {"error": "not found"}
+
+
+def _memory(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path == "/health":
+        return 200, {"status": "healthy"}
+    if path == "/recall":
+        return 200, {"documents": ["User: earlier question\nJessica: earlier answer"]}
+    if path in ("/store", "/store_batch"):
+        return 200, {"success": True}
+    return 404, {"error": "not found"}
+
+
+def _anthropic(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path == "/v1/messages":
+        return 200, {"content": [{"type": "text", "text": "Claude answer here."}]}
+    return 404, {"error": "not found"}
+
+
+def _xai(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path == "/v1/chat/completions":
+        return 200, {"choices": [{"message": {"role": "assistant", "content": "Grok answer here."}}]}
+    return 404, {"error": "not found"}
+
+
+def _google(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path.startswith("/v1beta/models/") and path.endswith(":generateContent"):
+        return 200, {"candidates": [{"content": {"parts": [{"text": "Gemini answer here."}]}}]}
+    return 404, {"error": "not found"}
+
+
+def _letta(method: str, path: str, body: Optional[dict]) -> Tuple[int, object]:
+    if path.endswith("/memories/search"):
+        return 200, {"memories": [{"content": "Cloud memory"}]}
+    if path.endswith("/memories"):
+        return 200, {"memories": []} if method == "GET" else {"id": "mem-1"}
+    return 404, {"error": "not found"}
+
+
+RESPONDERS: Dict[str, Responder] = {
+    "ollama": _ollama,
+    "memory": _memory,
+    "anthropic": _anthropic,
+    "xai": _xai,
+    "google": _google,
+    "letta": _letta,
+}
+
+
+class _FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (warm-up requests, shutdown) aren't worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeUpstream:
+    """One fake service on its own port, answering after a sampled delay"""
+
+    def __init__(self, name: str, latency: Latency, seed: Optional[int] = None):
+        self.name = name
+        self.latency = latency
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _FakeServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name=f"fake-{name}", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.requests += 1
+            return self.latency.sample(self._rng)
+
+    def _handler_class(self):
+        upstream = self
+        responder = RESPONDERS[self.name]
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+            disable_nagle_algorithm = True  # headers and body go out separately; don't add 40ms ACK stalls
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except json.JSONDecodeError:
+                    body = None
+
+                time.sleep(upstream._delay())
+                status, payload = responder(method, urlparse(self.path).path, body)
+
+                # Ollama streams NDJSON when asked to (warm-up and /chat/stream)
+                if upstream.name == "ollama" and isinstance(body, dict) and body.get("stream") and status == 200:
+                    data = "".join(json.dumps(chunk) + "\n" for chunk in (
+                        {"response": payload["response"], "done": False}, {"response": "", "done": True}
+                    )).encode()
+                    content_type = "application/x-ndjson"
+                else:
+                    data = json.dumps(payload).encode()
+                    content_type = "application/json"
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeUpstream":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def start_fake_upstreams(latencies: Dict[str, Latency], seed: Optional[int] = None) -> Dict[str, FakeUpstream]:
+    """
+    Start one fake server per upstream
+
+    Args:
+        latencies: Latency per upstream name (see RESPONDERS); missing names get no delay
+        seed: Seed for the latency jitter, for reproducible runs
+
+    Returns:
+        Dictionary of running FakeUpstream by name
+    """
+    return {
+        name: FakeUpstream(name, latencies.get(name, Latency()), None if seed is None else seed + index).start()
+        for index, name in enumerate(RESPONDERS)
+    }
+
+
+def upstream_env(upstreams: Dict[str, FakeUpstream]) -> Dict[str, str]:
+    """Environment variables pointing jessica_core / jessica_async at the fake upstreams"""
+    return {
+        "OLLAMA_URL": upstreams["ollama"].url,
+        "MEMORY_URL": upstreams["memory"].url,
+        "ANTHROPIC_API_URL": upstreams["anthropic"].url,
+        "XAI_API_URL": upstreams["xai"].url,
+        "GOOGLE_AI_API_URL": upstreams["google"].url,
+        "LETTA_BASE_URL": f"{upstreams['letta'].url}/v1",
+        # Fake keys so every provider counts as configured
+        "ANTHROPIC_API_KEY": "bench-key",
+        "XAI_API_KEY": "bench-key",
+        "GOOGLE_AI_API_KEY": "bench-key",
+        "LETTA_API_KEY": "bench-key",
+    }
@@ -0,0 +1,207 @@
+"""
+Circuit breakers for upstream services
+Fail fast while an upstream is down instead of waiting out its timeout on every call
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+from requests.exceptions import ConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures (connection errors, timeouts, 5xx) that open a circuit
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# Seconds an open circuit fails fast before one probe call is let through
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+# CIRCUIT_BREAKERS=0 records state but never fails a call fast
+CIRCUIT_BREAKERS_ENABLED = os.getenv("CIRCUIT_BREAKERS", "1") == "1"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """
+    Raised instead of calling an upstream whose circuit is open
+
+    A requests ConnectionError, so the existing "upstream unreachable"
+    handling around every call applies unchanged.
+    """
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open (next probe in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed -> open -> half-open circuit for one upstream
+
+    Closed: calls go through; `failure_threshold` consecutive failures open
+    the circuit. Open: calls raise CircuitOpenError immediately for
+    `recovery_timeout` seconds. Half-open: the next call is the probe - the
+    only one let through until it finishes. Success closes the circuit,
+    failure opens it for another `recovery_timeout`. A probe that never
+    reports back is replaced after `recovery_timeout`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+        enabled: bool = CIRCUIT_BREAKERS_ENABLED,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Upstream name (used in errors, logs and stats)
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to fail fast before probing
+            enabled: False = track state but never reject a call
+            clock: Monotonic time source (tests pass a fake one)
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def before_call(self):
+        """
+        Admit or reject one call
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with a probe in flight)
+        """
+        with self._lock:
+            if self._state == CLOSED or not self.enabled:
+                return
+            now = self._clock()
+            if self._state == OPEN:
+                remaining = self._opened_at + self.recovery_timeout - now
+                if remaining <= 0:
+                    self._state = HALF_OPEN
+                    self._probe_started = now
+                    logger.info(f"Circuit {self.name} half-open: probing")
+                    return
+            elif self._probe_started is None or now - self._probe_started >= self.recovery_timeout:
+                self._probe_started = now
+                return
+            else:
+                remaining = self._probe_started + self.recovery_timeout - now
+            self.rejected += 1
+        raise CircuitOpenError(self.name, max(remaining, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed: upstream recovered")
+                self._state = CLOSED
+                self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                if self._state == CLOSED:
+                    logger.warning(
+                        f"Circuit {self.name} opened after {self._consecutive_failures} consecutive failures; "
+                        f"failing fast for {self.recovery_timeout:.0f}s"
+                    )
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_started = None
+                self.times_opened += 1
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func through the breaker: any exception counts as a failure"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        """Close the circuit and clear its counters"""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_started = None
+            self.successes = self.failures = self.rejected = self.times_opened = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get circuit statistics
+
+        Returns:
+            Dictionary with state, consecutive failures, seconds until the next
+            probe (open circuits) and success/failure/rejected counters
+        """
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = round(max(self._opened_at + self.recovery_timeout - self._clock(), 0.0), 1)
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in_seconds": retry_in,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The shared breaker for an upstream, created with the default settings on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def get_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Statistics for every upstream breaker
+
+    Returns:
+        Dictionary keyed by upstream name
+    """
+    return {name: breaker.get_stats() for name, breaker in sorted(_breakers.items())}
@@ -1,207 +1,324 @@
-"""
-Command Parser Module
-Detects explicit routing commands and action commands from user messages.
-"""
-
-import re
-from typing import Optional, Dict, Tuple
-
-# Provider names for matching
-PROVIDER_NAMES = {
-    "claude": ["claude", "anthropic"],
-    "grok": ["grok", "xai", "x.ai"],
-    "gemini": ["gemini", "google ai", "google"],
-    "local": ["local", "jessica", "dolphin", "ollama"]
-}
-
-# Explicit routing patterns
-EXPLICIT_ROUTING_PATTERNS = [
-    r"use\s+(\w+)",
-    r"switch\s+to\s+(\w+)",
-    r"(\w+)\s+for\s+this",
-    r"route\s+to\s+(\w+)",
-    r"let\s+(\w+)\s+handle",
-    r"(\w+)\s+handle\s+this",
-    r"i\s+need\s+(\w+)",
-    r"(\w+)\s+analysis",
-    r"(\w+)\s+mode",
-]
-
-# Natural language routing patterns
-NATURAL_ROUTING_PATTERNS = {
-    "grok": [
-        r"research",
-        r"web\s+search",
-        r"look\s+up",
-        r"find\s+out",
-        r"what's\s+happening",
-        r"current\s+events",
-        r"latest\s+news",
-        r"investigate",
-        r"dig\s+into",
-    ],
-    "claude": [
-        r"complex\s+analysis",
-        r"deep\s+dive",
-        r"strategy",
-        r"plan",
-        r"analyze",
-        r"break\s+down",
-        r"comprehensive",
-        r"detailed",
-        r"reasoning",
-        r"think\s+through",
-    ],
-    "gemini": [
-        r"quick\s+lookup",
-        r"definition",
-        r"what\s+is",
-        r"explain\s+briefly",
-        r"summarize",
-        r"document",
-        r"pdf",
-        r"file",
-    ],
-}
-
-# Action command patterns
-ACTION_PATTERNS = {
-    "research": [
-        r"go\s+out\s+and\s+research",
-        r"research\s+(?:this|that|it)",
-    ],
-}
-
-
-def detect_explicit_routing(message: str) -> Optional[str]:
-    """
-    Detect explicit routing commands like "use Claude", "switch to Grok", etc.
-    
-    Args:
-        message: User's message
-        
-    Returns:
-        Provider name if detected, None otherwise
-    """
-    message_lower = message.lower()
-    
-    # Check explicit routing patterns
-    for pattern in EXPLICIT_ROUTING_PATTERNS:
-        matches = re.finditer(pattern, message_lower, re.IGNORECASE)
-        for match in matches:
-            provider_candidate = match.group(1).lower()
-            
-            # Check if it matches any provider name
-            for provider, names in PROVIDER_NAMES.items():
-                if provider_candidate in names or provider_candidate == provider:
-                    return provider
-    
-    return None
-
-
-def detect_natural_routing(message: str) -> Optional[str]:
-    """
-    Detect natural language routing patterns.
-    
-    Args:
-        message: User's message
-        
-    Returns:
-        Provider name if detected, None otherwise
-    """
-    message_lower = message.lower()
-    
-    # Check natural language patterns
-    for provider, patterns in NATURAL_ROUTING_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                return provider
-    
-    return None
-
-
-def detect_action_command(message: str) -> Optional[Dict[str, str]]:
-    """
-    Detect action commands like "create Google sheet", "research X", etc.
-    
-    Args:
-        message: User's message
-        
-    Returns:
-        Dict with 'type' and 'message' if action detected, None otherwise
-    """
-    message_lower = message.lower()
-    
-    for action_type, patterns in ACTION_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                return {
-                    "type": action_type,
-                    "message": message
-                }
-    
-    return None
-
-
-def extract_command_intent(message: str) -> Dict:
-    """
-    Main entry point for command parsing.
-    Extracts routing and action information from user message.
-    
-    Args:
-        message: User's message
-        
-    Returns:
-        Dict with routing and action information:
-        {
-            "routing": {
-                "provider": str | None,
-                "reason": str,
-                "command_type": "explicit" | "natural" | "action" | "keyword" | "default"
-            },
-            "action": {
-                "type": str | None,
-                "message": str
-            }
-        }
-    """
-    result = {
-        "routing": {
-            "provider": None,
-            "reason": "",
-            "command_type": "default"
-        },
-        "action": None
-    }
-    
-    # Check for explicit routing first (highest priority)
-    explicit_provider = detect_explicit_routing(message)
-    if explicit_provider:
-        result["routing"]["provider"] = explicit_provider
-        result["routing"]["reason"] = f"Explicit routing command detected: {explicit_provider}"
-        result["routing"]["command_type"] = "explicit"
-        return result
-    
-    # Check for action commands
-    action = detect_action_command(message)
-    if action:
-        result["action"] = action
-        result["routing"]["command_type"] = "action"
-        # Action commands may imply routing (e.g., research → grok)
-        # But we'll let the main routing logic handle keyword-based routing
-        return result
-    
-    # Check for natural language routing
-    natural_provider = detect_natural_routing(message)
-    if natural_provider:
-        result["routing"]["provider"] = natural_provider
-        result["routing"]["reason"] = f"Natural language routing detected: {natural_provider}"
-        result["routing"]["command_type"] = "natural"
-        return result
-    
-    # No command detected - will fall back to keyword-based routing
-    result["routing"]["command_type"] = "keyword"
-    result["routing"]["reason"] = "No explicit command - using keyword-based routing"
-    
-    return result
-
+"""
+Command Parser Module
+Detects explicit routing commands and action commands from user messages.
+"""
+
+import re
+from typing import Optional, Dict, Iterable, Sequence, Tuple
+
+# Provider names for matching
+PROVIDER_NAMES = {
+    "claude": ["claude", "anthropic"],
+    "grok": ["grok", "xai", "x.ai"],
+    "gemini": ["gemini", "google ai", "google"],
+    "local": ["local", "jessica", "dolphin", "ollama"]
+}
+
+# Explicit routing patterns
+EXPLICIT_ROUTING_PATTERNS = [
+    r"use\s+(\w+)",
+    r"switch\s+to\s+(\w+)",
+    r"(\w+)\s+for\s+this",
+    r"route\s+to\s+(\w+)",
+    r"let\s+(\w+)\s+handle",
+    r"(\w+)\s+handle\s+this",
+    r"i\s+need\s+(\w+)",
+    r"(\w+)\s+analysis",
+    r"(\w+)\s+mode",
+]
+
+# Natural language routing patterns
+NATURAL_ROUTING_PATTERNS = {
+    "grok": [
+        r"research",
+        r"web\s+search",
+        r"look\s+up",
+        r"find\s+out",
+        r"what's\s+happening",
+        r"current\s+events",
+        r"latest\s+news",
+        r"investigate",
+        r"dig\s+into",
+    ],
+    "claude": [
+        r"complex\s+analysis",
+        r"deep\s+dive",
+        r"strategy",
+        r"plan",
+        r"analyze",
+        r"break\s+down",
+        r"comprehensive",
+        r"detailed",
+        r"reasoning",
+        r"think\s+through",
+    ],
+    "gemini": [
+        r"quick\s+lookup",
+        r"definition",
+        r"what\s+is",
+        r"explain\s+briefly",
+        r"summarize",
+        r"document",
+        r"pdf",
+        r"file",
+    ],
+}
+
+# Action command patterns
+ACTION_PATTERNS = {
+    "research": [
+        r"go\s+out\s+and\s+research",
+        r"research\s+(?:this|that|it)",
+    ],
+}
+
+
+# Words that introduce a provider name in EXPLICIT_ROUTING_PATTERNS ("use X", "switch to X", ...)
+_EXPLICIT_LEAD_WORDS = ("use", "to", "let", "need")
+
+
+class RoutingMatcher:
+    """
+    Precompiled routing patterns, evaluated against the lowercased message
+
+    Every pattern starts with a literal, so each compiled search runs
+    sre's fast literal-prefix scan; keywords are plain substring checks.
+    Rules are evaluated in priority order and skipped once they can no
+    longer change the decision. Explicit routing patterns only run when
+    a provider name sits next to one of their trigger words - the
+    "(\\w+)" patterns are by far the most expensive and can't match otherwise.
+
+    Short messages are first checked against one alternation of every
+    phrase: a miss settles them in a single call, where per-pattern call
+    overhead would dominate. Past GATE_MAX_LENGTH the alternation (no
+    literal prefix to skip ahead on) is slower than the separate scans.
+    """
+
+    GATE_MAX_LENGTH = 256
+
+    def __init__(self, keyword_routes: Sequence[Tuple[str, Iterable[str]]] = ()):
+        """
+        Args:
+            keyword_routes: (provider, keywords) pairs in priority order; keywords
+                are plain substrings, as in jessica_core's keyword sets
+        """
+        self.keyword_routes = [(provider, tuple(keywords)) for provider, keywords in keyword_routes]
+
+        self._explicit_patterns = [re.compile(pattern) for pattern in EXPLICIT_ROUTING_PATTERNS]
+        self._provider_lookup = {provider: provider for provider in PROVIDER_NAMES}
+        for provider, names in PROVIDER_NAMES.items():
+            for name in names:
+                self._provider_lookup.setdefault(name, provider)
+        # Only single words can be captured by (\w+)
+        self._capturable_names = tuple(name for name in self._provider_lookup if re.fullmatch(r"\w+", name))
+        self._trailing_triggers = {
+            name: re.compile(rf"{name}\s+(?:for\s+this|handle|analysis|mode)") for name in self._capturable_names
+        }
+
+        self._natural_patterns = [
+            (provider, [re.compile(pattern) for pattern in patterns])
+            for provider, patterns in NATURAL_ROUTING_PATTERNS.items()
+        ]
+        self._action_patterns = [
+            (action_type, [re.compile(pattern) for pattern in patterns])
+            for action_type, patterns in ACTION_PATTERNS.items()
+        ]
+        phrases = [pattern for patterns in NATURAL_ROUTING_PATTERNS.values() for pattern in patterns]
+        phrases += [pattern for patterns in ACTION_PATTERNS.values() for pattern in patterns]
+        phrases += [re.escape(keyword) for _, keywords in self.keyword_routes for keyword in keywords]
+        self._any_phrase = re.compile("|".join(f"(?:{pattern})" for pattern in phrases))
+
+    def _explicit_trigger_present(self, message_lower: str) -> bool:
+        """Whether any provider name follows a lead word or precedes a trailing trigger"""
+        for name in self._capturable_names:
+            pos = message_lower.find(name)
+            if pos == -1:
+                continue
+            if self._trailing_triggers[name].search(message_lower, pos):
+                return True
+            while pos != -1:
+                end = pos
+                while end > 0 and message_lower[end - 1].isspace():
+                    end -= 1
+                if end < pos and message_lower.endswith(_EXPLICIT_LEAD_WORDS, 0, end):
+                    return True
+                pos = message_lower.find(name, pos + 1)
+        return False
+
+    def match_explicit(self, message_lower: str) -> Optional[str]:
+        """Provider named by an explicit routing command, or None"""
+        if not self._explicit_trigger_present(message_lower):
+            return None
+        for pattern in self._explicit_patterns:
+            for match in pattern.finditer(message_lower):
+                provider = self._provider_lookup.get(match.group(1))
+                if provider:
+                    return provider
+        return None
+
+    def match_action(self, message_lower: str) -> Optional[str]:
+        """First action type whose patterns match, or None"""
+        for action_type, patterns in self._action_patterns:
+            for pattern in patterns:
+                if pattern.search(message_lower):
+                    return action_type
+        return None
+
+    def match_natural(self, message_lower: str) -> Optional[str]:
+        """First provider whose natural language patterns match, or None"""
+        for provider, patterns in self._natural_patterns:
+            for pattern in patterns:
+                if pattern.search(message_lower):
+                    return provider
+        return None
+
+    def match_keyword(self, message_lower: str) -> Optional[str]:
+        """First keyword route with a keyword in the message, or None"""
+        for provider, keywords in self.keyword_routes:
+            for keyword in keywords:
+                if keyword in message_lower:
+                    return provider
+        return None
+
+    def match(self, message: str) -> Dict[str, Optional[str]]:
+        """
+        Evaluate the routing rules against a message, in priority order
+        
+        Rules that can't change the outcome are skipped and left None:
+        nothing after an explicit command, and natural routing after an
+        action (actions still fall back to keyword routing).
+        
+        Returns:
+            Dict with 'explicit', 'action', 'natural' and 'keyword' hits
+            (provider / action type, or None)
+        """
+        message_lower = message.lower()
+        result = {"explicit": self.match_explicit(message_lower), "action": None, "natural": None, "keyword": None}
+        if result["explicit"]:
+            return result
+        if len(message_lower) <= self.GATE_MAX_LENGTH and not self._any_phrase.search(message_lower):
+            return result
+        result["action"] = self.match_action(message_lower)
+        if not result["action"]:
+            result["natural"] = self.match_natural(message_lower)
+            if result["natural"]:
+                return result
+        result["keyword"] = self.match_keyword(message_lower)
+        return result
+
+
+# Shared matcher for the module-level helpers (no keyword routes)
+_default_matcher = RoutingMatcher()
+
+
+def detect_explicit_routing(message: str) -> Optional[str]:
+    """
+    Detect explicit routing commands like "use Claude", "switch to Grok", etc.
+    
+    Args:
+        message: User's message
+        
+    Returns:
+        Provider name if detected, None otherwise
+    """
+    return _default_matcher.match_explicit(message.lower())
+
+
+def detect_natural_routing(message: str) -> Optional[str]:
+    """
+    Detect natural language routing patterns.
+    
+    Args:
+        message: User's message
+        
+    Returns:
+        Provider name if detected, None otherwise
+    """
+    return _default_matcher.match_natural(message.lower())
+
+
+def detect_action_command(message: str) -> Optional[Dict[str, str]]:
+    """
+    Detect action commands like "create Google sheet", "research X", etc.
+    
+    Args:
+        message: User's message
+        
+    Returns:
+        Dict with 'type' and 'message' if action detected, None otherwise
+    """
+    action_type = _default_matcher.match_action(message.lower())
+    if action_type:
+        return {
+            "type": action_type,
+            "message": message
+        }
+    
+    return None
+
+
+def extract_command_intent(message: str, match: Optional[Dict] = None) -> Dict:
+    """
+    Main entry point for command parsing.
+    Extracts routing and action information from user message.
+    
+    Args:
+        message: User's message
+        match: Result of RoutingMatcher.match() for this message, if already computed
+        
+    Returns:
+        Dict with routing and action information:
+        {
+            "routing": {
+                "provider": str | None,
+                "reason": str,
+                "command_type": "explicit" | "natural" | "action" | "keyword" | "default"
+            },
+            "action": {
+                "type": str | None,
+                "message": str
+            }
+        }
+    """
+    result = {
+        "routing": {
+            "provider": None,
+            "reason": "",
+            "command_type": "default"
+        },
+        "action": None
+    }
+    
+    if match is None:
+        match = _default_matcher.match(message)
+    
+    # Check for explicit routing first (highest priority)
+    explicit_provider = match["explicit"]
+    if explicit_provider:
+        result["routing"]["provider"] = explicit_provider
+        result["routing"]["reason"] = f"Explicit routing command detected: {explicit_provider}"
+        result["routing"]["command_type"] = "explicit"
+        return result
+    
+    # Check for action commands
+    if match["action"]:
+        result["action"] = {"type": match["action"], "message": message}
+        result["routing"]["command_type"] = "action"
+        # Action commands may imply routing (e.g., research → grok)
+        # But we'll let the main routing logic handle keyword-based routing
+        return result
+    
+    # Check for natural language routing
+    natural_provider = match["natural"]
+    if natural_provider:
+        result["routing"]["provider"] = natural_provider
+        result["routing"]["reason"] = f"Natural language routing detected: {natural_provider}"
+        result["routing"]["command_type"] = "natural"
+        return result
+    
+    # No command detected - will fall back to keyword-based routing
+    result["routing"]["command_type"] = "keyword"
+    result["routing"]["reason"] = "No explicit command - using keyword-based routing"
+    
+    return result
+
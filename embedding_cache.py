@@ -0,0 +1,172 @@
+"""
+Embedding cache for the memory server
+LRU cache in front of a ChromaDB embedding function, keyed by text hash
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before hashing so trivial variants share one embedding
+
+    Collapses whitespace and lowercases. The default ChromaDB embedder
+    (all-MiniLM-L6-v2) uses an uncased tokenizer, so case never changed
+    the embedding anyway.
+    """
+    return " ".join(text.split()).lower()
+
+
+def text_key(text: str) -> str:
+    """Cache key for a text: SHA256 of its normalized form"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class CachingEmbeddingFunction:
+    """
+    Wraps an embedding function with a bounded, thread-safe LRU cache
+
+    Usable anywhere ChromaDB expects an embedding function, so both
+    collection.add (store) and collection.query (recall) go through it.
+    Only texts missing from the cache are sent to the wrapped function, in
+    a single batched call.
+    """
+
+    def __init__(
+        self,
+        embed_func: Callable[[List[str]], List[List[float]]],
+        max_size: int = 10000,
+        persist_path: Optional[str] = None
+    ):
+        """
+        Args:
+            embed_func: Underlying embedding function (list of texts -> list of vectors)
+            max_size: Maximum number of cached embeddings
+            persist_path: Optional .npz file to load from / save to (None = memory only)
+        """
+        self.embed_func = embed_func
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if persist_path:
+            self.load()
+
+    # ChromaDB validates that __call__ takes exactly (self, input)
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Embed texts, serving repeated (normalized) texts from the cache"""
+        keys = [text_key(text) for text in input]
+        embeddings: List[Optional[List[float]]] = [None] * len(input)
+        missing: Dict[str, List[int]] = OrderedDict()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    embeddings[i] = cached
+                    self.hits += 1
+                else:
+                    # Duplicate texts within one call are embedded once
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+
+        if missing:
+            texts = [input[positions[0]] for positions in missing.values()]
+            vectors = self.embed_func(texts)
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), vectors):
+                    vector = list(vector)
+                    for i in positions:
+                        embeddings[i] = vector
+                    self._cache[key] = vector
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+
+        return embeddings
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, hit/miss counters and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'persist_path': self.persist_path,
+            }
+
+    def save(self) -> bool:
+        """
+        Write the cache to persist_path (numpy .npz, no pickle)
+
+        Returns:
+            True if saved, False if persistence is disabled or saving failed
+        """
+        if not self.persist_path:
+            return False
+        try:
+            import numpy as np
+
+            with self._lock:
+                keys = list(self._cache.keys())
+                vectors = list(self._cache.values())
+            if not keys:
+                return False
+
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write then rename so a crash never leaves a truncated cache file
+            tmp_path = self.persist_path + ".tmp.npz"
+            np.savez(tmp_path, keys=np.array(keys), vectors=np.array(vectors, dtype=np.float32))
+            os.replace(tmp_path, self.persist_path)
+            logger.info(f"Saved {len(keys)} cached embeddings to {self.persist_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save embedding cache: {e}")
+            return False
+
+    def load(self) -> int:
+        """
+        Load cached embeddings from persist_path if it exists
+
+        Returns:
+            Number of embeddings loaded
+        """
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return 0
+        try:
+            import numpy as np
+
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                keys = data['keys'].tolist()
+                vectors = data['vectors'].tolist()
+            with self._lock:
+                # Keep the most recent entries if the file exceeds max_size
+                for key, vector in list(zip(keys, vectors))[-self.max_size:]:
+                    self._cache[key] = vector
+            logger.info(f"Loaded {len(self._cache)} cached embeddings from {self.persist_path}")
+            return len(self._cache)
+        except Exception as e:
+            logger.error(f"Failed to load embedding cache: {e}")
+            return 0
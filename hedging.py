@@ -0,0 +1,278 @@
+"""
+Hedged requests for latency-sensitive upstream reads
+If the first attempt is slower than the upstream's usual p95, send an
+identical second request and take whichever answers first
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from performance_monitor import LatencyHistogram
+from tracing import submit_in_context
+
+logger = logging.getLogger(__name__)
+
+# HEDGED_REQUESTS=1 enables hedging for recall and the /status probes (off by default)
+HEDGING_ENABLED = os.getenv("HEDGED_REQUESTS", "0") == "1"
+# Send the hedge once the first attempt is slower than this percentile of the upstream's latency
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "95"))
+# Never hedge sooner than this (seconds), however fast the upstream usually is
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.02"))
+# Hedge budget: each hedged call earns this many hedges (0.1 = at most ~10% extra load),
+# banked up to HEDGE_BUDGET_BURST
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+HEDGE_BUDGET_BURST = float(os.getenv("HEDGE_BUDGET_BURST", "10"))
+HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", "16"))
+
+
+class HedgeBudget:
+    """
+    Caps hedges at a fraction of calls
+
+    Every call deposits `ratio` tokens (up to `burst`); a hedge spends one.
+    Unlike a time-based bucket this scales with traffic, so hedging adds
+    at most `ratio` extra load however busy or slow the upstreams get.
+    """
+
+    def __init__(self, ratio: float = HEDGE_BUDGET_RATIO, burst: float = HEDGE_BUDGET_BURST):
+        """
+        Args:
+            ratio: Hedges earned per call
+            burst: Most hedges that can be banked
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.denied = 0
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+            # Rounded so ten deposits of 0.1 make a whole hedge
+            self._tokens = min(self.burst, round(self._tokens + self.ratio, 9))
+
+    def try_acquire(self) -> bool:
+        """Spend one hedge if the budget allows it"""
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.hedges += 1
+                return True
+            self.denied += 1
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get budget statistics
+
+        Returns:
+            Dictionary with banked tokens, ratio and call/hedge/denied counters
+        """
+        with self._lock:
+            return {
+                "tokens": round(self._tokens, 2),
+                "ratio": self.ratio,
+                "burst": self.burst,
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "denied": self.denied,
+            }
+
+
+hedge_budget = HedgeBudget()
+
+# Hedged calls and hedge wins per upstream name
+_hedge_counts: Dict[str, Dict[str, int]] = {}
+_hedge_counts_lock = threading.Lock()
+
+# Latency of successful attempts per upstream name, hedges and losers included.
+# Kept apart from PerformanceMetrics so hedging never changes the API-call totals.
+_hedge_latencies: Dict[str, LatencyHistogram] = {}
+_hedge_latencies_lock = threading.Lock()
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _ensure_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+    return _hedge_executor
+
+
+def _count(name: str, key: str):
+    with _hedge_counts_lock:
+        counts = _hedge_counts.setdefault(name, {"calls": 0, "hedged": 0, "hedge_won": 0})
+        counts[key] += 1
+
+
+def _record_latency(name: str, duration: float):
+    with _hedge_latencies_lock:
+        histogram = _hedge_latencies.get(name)
+        if histogram is None:
+            histogram = _hedge_latencies[name] = LatencyHistogram()
+        histogram.record(duration)
+
+
+def hedge_delay(name: str) -> Optional[float]:
+    """
+    Seconds to wait before hedging a call to `name`
+
+    Returns:
+        The upstream's HEDGE_QUANTILE latency (at least HEDGE_MIN_DELAY),
+        or None while it has no recorded successful attempts
+    """
+    with _hedge_latencies_lock:
+        histogram = _hedge_latencies.get(name)
+        latency = histogram.percentiles([HEDGE_QUANTILE])[0] if histogram else None
+    return None if latency is None else max(latency, HEDGE_MIN_DELAY)
+
+
+def _timed(name: str, func: Callable, *args, **kwargs) -> Any:
+    """Run one attempt and record its latency if it succeeds - losing attempts included, so p95 isn't skewed"""
+    start = time.time()
+    result = func(*args, **kwargs)
+    _record_latency(name, time.time() - start)
+    return result
+
+
+def hedged_call(name: str, func: Callable, *args, **kwargs) -> Any:
+    """
+    Call func, sending an identical second call if the first is slow
+
+    Only for idempotent reads. With hedging disabled this is func(*args,
+    **kwargs). Otherwise the first attempt runs on the hedge pool; if it
+    hasn't finished hedge_delay(name) after it started running (time queued
+    for a busy pool doesn't count) and the hedge budget allows, a second
+    attempt starts and the first to succeed wins. The slower
+    attempt is left to finish in the background and its result dropped.
+    An error is only raised once both attempts have failed.
+
+    Args:
+        name: Upstream name - its recorded attempt latency sets the delay
+        func: The call to make
+
+    Returns:
+        The winning attempt's result
+    """
+    if not HEDGING_ENABLED:
+        return func(*args, **kwargs)
+
+    _count(name, "calls")
+    hedge_budget.record_call()
+    delay = hedge_delay(name)
+    if delay is None:
+        # No latency data yet - run inline and start learning
+        return _timed(name, func, *args, **kwargs)
+
+    executor = _ensure_executor()
+    started = threading.Event()
+
+    def first_attempt():
+        started.set()
+        return _timed(name, func, *args, **kwargs)
+
+    primary = submit_in_context(executor, first_attempt)
+    # A saturated pool is no reason to hedge - and a hedge would only queue behind it
+    started.wait()
+    done, _ = wait([primary], timeout=delay)
+    if done or not hedge_budget.try_acquire():
+        return primary.result()
+
+    _count(name, "hedged")
+    logger.debug(f"Hedging {name} call after {delay:.3f}s")
+    hedge = submit_in_context(executor, _timed, name, func, *args, **kwargs)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = next((future for future in done if future.exception() is None), None)
+        if winner is not None:
+            if winner is hedge:
+                _count(name, "hedge_won")
+            return winner.result()
+    # Both attempts failed
+    return primary.result()
+
+
+async def hedged_call_async(name: str, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+    """
+    Async hedged_call(): same delay, budget and counters
+
+    The losing attempt is cancelled (its HTTP request is closed) rather
+    than left to finish.
+
+    Args:
+        name: Upstream name - its recorded attempt latency sets the delay
+        func: Coroutine function making the call
+
+    Returns:
+        The winning attempt's result
+    """
+    if not HEDGING_ENABLED:
+        return await func(*args, **kwargs)
+
+    async def timed():
+        start = time.time()
+        result = await func(*args, **kwargs)
+        _record_latency(name, time.time() - start)
+        return result
+
+    _count(name, "calls")
+    hedge_budget.record_call()
+    delay = hedge_delay(name)
+    if delay is None:
+        return await timed()
+
+    primary = asyncio.create_task(timed())
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done or not hedge_budget.try_acquire():
+            return await primary
+
+        _count(name, "hedged")
+        logger.debug(f"Hedging {name} call after {delay:.3f}s")
+        hedge = asyncio.create_task(timed())
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is not None:
+                if winner is hedge:
+                    _count(name, "hedge_won")
+                return winner.result()
+    finally:
+        # The loser - or both attempts, if the caller was cancelled
+        for task in pending:
+            task.cancel()
+    # Both attempts failed
+    return primary.result()
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    """
+    Hedging statistics
+
+    Returns:
+        Dictionary with the enabled flag, budget stats and per-upstream
+        calls/hedged/hedge_won counters
+    """
+    with _hedge_counts_lock:
+        upstreams = {name: dict(counts) for name, counts in sorted(_hedge_counts.items())}
+    return {
+        "enabled": HEDGING_ENABLED,
+        "quantile": HEDGE_QUANTILE,
+        "budget": hedge_budget.get_stats(),
+        "upstreams": upstreams,
+    }
@@ -0,0 +1,192 @@
+"""
+Per-upstream HTTP connection pools for Jessica Core
+Mounts a tuned, instrumented requests adapter for each upstream service
+"""
+
+import socket
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from circuit_breaker import CircuitBreaker, get_breaker
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpstreamPoolConfig:
+    """Connection pool settings for one upstream (one URL prefix)"""
+    name: str
+    prefix: str
+    pool_maxsize: int = 10          # connections kept per host (== max concurrent without discards)
+    pool_connections: int = 1       # distinct hosts cached behind this prefix
+    pool_block: bool = False        # wait for a free connection instead of opening a throwaway one
+    keepalive_idle: Optional[int] = None  # seconds before TCP keep-alive probes (None = OS default)
+    circuit_breaker: Optional[str] = None  # name of the circuit_breaker guarding this upstream
+
+
+def _keepalive_socket_options(idle: Optional[int]) -> list:
+    """Socket options enabling TCP keep-alive so idle pooled connections survive NATs/LBs"""
+    options = list(HTTPConnection.default_socket_options)
+    if idle is None:
+        return options
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # TCP_KEEPIDLE/TCP_KEEPINTVL are Linux names; macOS uses TCP_KEEPALIVE for idle
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+    elif hasattr(socket, "TCP_KEEPALIVE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, idle // 3)))
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with tuned pool settings and utilization counters
+
+    `in_flight` counts requests waiting for response headers; when it
+    exceeds pool_maxsize, urllib3 has to open extra connections that are
+    discarded afterwards ("Connection pool is full"), which shows up here
+    as `saturated` in get_stats().
+
+    With `circuit_breaker` set, an open circuit rejects the request before
+    any connection is touched; connection errors, timeouts and 5xx
+    responses count as failures.
+    """
+
+    def __init__(self, config: UpstreamPoolConfig):
+        self.pool_config = config
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated = 0
+        self.breaker: Optional[CircuitBreaker] = (
+            get_breaker(config.circuit_breaker) if config.circuit_breaker else None
+        )
+        super().__init__(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+            pool_block=config.pool_block
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs["socket_options"] = _keepalive_socket_options(self.pool_config.keepalive_idle)
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        if self.breaker is not None:
+            self.breaker.before_call()
+        with self._stats_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.in_flight > self.pool_config.pool_maxsize:
+                self.saturated += 1
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            with self._stats_lock:
+                self.errors += 1
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+        if self.breaker is not None:
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool utilization statistics
+
+        Returns:
+            Dictionary with pool settings, request counters and per-host connection counts
+        """
+        hosts = {}
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                # The pool queue is pre-filled with None placeholders; count real connections
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                if pool.pool is not None else 0,
+                "requests": pool.num_requests,
+            }
+
+        with self._stats_lock:
+            return {
+                "prefix": self.pool_config.prefix,
+                "pool_maxsize": self.pool_config.pool_maxsize,
+                "pool_block": self.pool_config.pool_block,
+                "keepalive_idle": self.pool_config.keepalive_idle,
+                "circuit_breaker": self.pool_config.circuit_breaker,
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "utilization": round(self.in_flight / self.pool_config.pool_maxsize, 3),
+                "saturated": self.saturated,
+                "hosts": hosts,
+            }
+
+
+def build_session(upstreams: List[UpstreamPoolConfig], default: UpstreamPoolConfig = None) -> requests.Session:
+    """
+    Create a Session with one PooledHTTPAdapter mounted per upstream prefix
+
+    requests routes each call to the adapter with the longest matching
+    prefix, so callers keep using a single session object.
+
+    Args:
+        upstreams: Pool configuration for each upstream
+        default: Configuration for any other http(s) URL (default: requests' own settings)
+    """
+    session = requests.Session()
+    default = default or UpstreamPoolConfig(name="default", prefix="")
+    for scheme in ("http://", "https://"):
+        session.mount(scheme, PooledHTTPAdapter(UpstreamPoolConfig(
+            name=f"{default.name}_{scheme[:-3]}",
+            prefix=scheme,
+            pool_maxsize=default.pool_maxsize,
+            pool_connections=default.pool_connections,
+            pool_block=default.pool_block,
+            keepalive_idle=default.keepalive_idle
+        )))
+    for config in upstreams:
+        session.mount(config.prefix, PooledHTTPAdapter(config))
+    return session
+
+
+def get_pool_stats(session: requests.Session) -> Dict[str, Any]:
+    """
+    Pool statistics for every PooledHTTPAdapter mounted on a session
+
+    Returns:
+        Dictionary keyed by upstream name
+    """
+    stats = {}
+    for prefix, adapter in session.adapters.items():
+        if not isinstance(adapter, PooledHTTPAdapter):
+            continue
+        name = adapter.pool_config.name
+        if name in stats:
+            name = f"{name} ({prefix})"
+        stats[name] = adapter.get_stats()
+    return stats
@@ -0,0 +1,1119 @@
+"""
+Jessica Core - async (ASGI) variant
+Same routes and routing as jessica_core.py, with non-blocking upstream I/O
+
+Run with:
+    uvicorn jessica_async:app --host 0.0.0.0 --port 8000
+
+Every upstream call on the request path (Ollama, Claude, Grok, Gemini,
+memory_server, Letta) goes through one shared httpx.AsyncClient, so a request
+waiting up to OLLAMA_TIMEOUT on a local model holds a coroutine instead of an
+OS thread. Settings (jessica_config), and validation, routing, prompt assembly
+and upstream payloads (chat_requests) are the same modules jessica_core uses,
+so both apps answer identically; this module never imports the Flask app.
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import asyncio
+import logging
+import functools
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import requests
+from limits import parse as parse_rate_limit
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from exceptions import APIError, ValidationError
+from circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker, get_breaker_stats
+from hedging import hedged_call_async, get_hedge_stats
+from http_pools import UpstreamPoolConfig, build_session
+from memory_writer import MemoryWriteQueue
+from recall_cache import RecallCache
+from logging_config import get_logging_stats
+from performance_monitor import metrics, resource_sampler, track_api_call, PROMETHEUS_CONTENT_TYPE
+from retry_utils import (
+    retry_with_backoff, retry_budget, is_retryable, is_unsent_error, current_deadline, deadline_scope,
+    deadline_timeout, aiter_with_deadline
+)
+from jessica_config import (
+    USER_ID, RATE_LIMIT_CHAT, RATE_LIMIT_PROXY, get_rate_limit_key,
+    OLLAMA_URL, MEMORY_URL, ANTHROPIC_API_URL, XAI_API_URL, GOOGLE_AI_API_URL,
+    LETTA_BASE_URL, LETTA_API_KEY, LETTA_TIMEOUT,
+    ANTHROPIC_API_KEY, XAI_API_KEY, GOOGLE_AI_API_KEY, MEM0_API_KEY,
+    API_TIMEOUT, LOCAL_SERVICE_TIMEOUT, HEALTH_CHECK_TIMEOUT, OLLAMA_TIMEOUT, OLLAMA_KEEP_ALIVE, OLLAMA_WARMUP_TIMEOUT, HTTP_UPSTREAMS,
+    MEMORY_RECALL_BUDGET, CHAT_REQUEST_DEADLINE,
+    UPSTREAM_MAX_RETRIES, UPSTREAM_RETRY_INITIAL_DELAY, UPSTREAM_RETRY_MAX_DELAY,
+    DEFAULT_OLLAMA_MODEL, FALLBACK_OLLAMA_MODEL, GEMINI_MODEL,
+    RECALL_CACHE_TTL, RECALL_CACHE_SIZE,
+    MEMORY_WRITE_WORKERS, MEMORY_WRITE_QUEUE_DEPTH, MEMORY_WRITE_ENQUEUE_TIMEOUT,
+    MEMORY_WRITE_SHUTDOWN_TIMEOUT, MEMORY_WRITE_BATCH_SIZE, MEMORY_WRITE_BATCH_WINDOW,
+)
+from chat_requests import (
+    route_messages, get_routing_cache_stats, parse_route_body, route_message,
+    parse_chat_body, assemble_chat_request, build_chat_metadata, stream_event, modes_info,
+    ollama_payload, claim_ollama_warmup, letta_memory_texts, is_error_reply,
+    claude_request, grok_request, gemini_payload,
+    claude_stream_fragment, grok_stream_fragment, gemini_stream_fragment,
+    memory_record, store_batch_payload, letta_request,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Connection limits for the shared async client. Far more in-flight requests
+# than the Flask app's thread count - that is the point of this variant.
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_MAX_KEEPALIVE = int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "20"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Fire-and-forget tasks (Ollama warm-up) - referenced here so they aren't garbage collected
+_background_tasks = set()
+
+# Invalidated per user whenever a memory write for that user is queued or completes
+recall_cache = RecallCache(ttl=RECALL_CACHE_TTL, max_size=RECALL_CACHE_SIZE, name="memory_recall")
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport with the per-upstream circuit breakers
+
+    The breakers come from circuit_breaker.get_breaker, like those of the
+    requests sessions http_pools builds, so every client in the process sees
+    one circuit per upstream. An open circuit raises
+    httpx.ConnectError without touching the network.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstreams: List[UpstreamPoolConfig]):
+        self._transport = transport
+        # Longest prefix first, matching how requests picks a mounted adapter
+        self._breakers = sorted(
+            ((config.prefix, get_breaker(config.circuit_breaker)) for config in upstreams if config.circuit_breaker),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+
+    def _breaker_for(self, url: str) -> Optional[CircuitBreaker]:
+        for prefix, breaker in self._breakers:
+            if url.startswith(prefix):
+                return breaker
+        return None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = self._breaker_for(str(request.url))
+        if breaker is None:
+            return await self._transport.handle_async_request(request)
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled AsyncClient, created on first use and closed on shutdown"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(transport=CircuitBreakerTransport(
+            httpx.AsyncHTTPTransport(limits=httpx.Limits(
+                max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_HTTP_MAX_KEEPALIVE
+            )),
+            HTTP_UPSTREAMS
+        ))
+    return _http_client
+
+
+# =============================================================================
+# LOCAL OLLAMA
+# =============================================================================
+
+async def _ollama_generate_async(model_name: str, user_message: str, system_prompt: str) -> str:
+    """One blocking-style generate call to a specific model (raises on failure)"""
+    logger.info(f"Ollama Generate API (async) - Model: {model_name}")
+    response = await get_http_client().post(
+        f"{OLLAMA_URL}/api/generate",
+        json=ollama_payload(model_name, user_message, system_prompt),
+        timeout=deadline_timeout(OLLAMA_TIMEOUT)
+    )
+    response.raise_for_status()
+    return response.json().get('response', 'Error: No response from local model')
+
+
+@track_api_call('ollama', is_failure=is_error_reply)
+async def call_local_ollama_async(system_prompt: str, user_message: str, model: str = DEFAULT_OLLAMA_MODEL,
+                                  fallback_system_prompt: str = None) -> str:
+    """Async call_local_ollama(): same prompts, same fallback to FALLBACK_OLLAMA_MODEL"""
+    try:
+        return await _ollama_generate_async(model, user_message, system_prompt)
+    except Exception as e:
+        logger.warning(f"Primary model {model} failed: {e}")
+
+        # Try fallback if different from primary
+        if model != FALLBACK_OLLAMA_MODEL:
+            try:
+                logger.info(f"Trying fallback model: {FALLBACK_OLLAMA_MODEL}")
+                # CRITICAL: Use full system prompt for fallback - generic models need personality!
+                fallback_prompt = fallback_system_prompt if fallback_system_prompt else system_prompt
+                return await _ollama_generate_async(FALLBACK_OLLAMA_MODEL, user_message, fallback_prompt)
+            except Exception as e2:
+                logger.error(f"Fallback model also failed: {e2}")
+
+        return f"Error calling local Ollama: {str(e)}"
+
+
+async def _ollama_stream_model_async(model_name: str, user_message: str, system_prompt: str) -> AsyncIterator[str]:
+    """Open a streaming generate request and yield response fragments"""
+    logger.info(f"Ollama Generate API (async stream) - Model: {model_name}")
+    async with get_http_client().stream(
+        "POST",
+        f"{OLLAMA_URL}/api/generate",
+        json=ollama_payload(model_name, user_message, system_prompt, stream=True),
+        timeout=deadline_timeout(OLLAMA_TIMEOUT)
+    ) as response:
+        response.raise_for_status()
+        # Ollama streams NDJSON: one object per line, last one has "done": true
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            fragment = data.get("response")
+            if fragment:
+                yield fragment
+            if data.get("done"):
+                break
+
+
+@track_api_call('ollama', is_failure=is_error_reply)
+async def stream_local_ollama_async(system_prompt: str, user_message: str, model: str = DEFAULT_OLLAMA_MODEL,
+                                    fallback_system_prompt: str = None) -> AsyncIterator[str]:
+    """Async stream_local_ollama(): falls back only if the primary fails before any output"""
+    produced_output = False
+    try:
+        async for fragment in _ollama_stream_model_async(model, user_message, system_prompt):
+            produced_output = True
+            yield fragment
+        return
+    except Exception as e:
+        if produced_output:
+            logger.error(f"Ollama stream from {model} failed mid-response: {e}")
+            raise
+        logger.warning(f"Primary model {model} failed: {e}")
+        primary_error = e
+
+    # Try fallback if different from primary
+    if model != FALLBACK_OLLAMA_MODEL:
+        try:
+            logger.info(f"Trying fallback model: {FALLBACK_OLLAMA_MODEL}")
+            # CRITICAL: Use full system prompt for fallback - generic models need personality!
+            fallback_prompt = fallback_system_prompt if fallback_system_prompt else system_prompt
+            produced_output = False
+            async for fragment in _ollama_stream_model_async(FALLBACK_OLLAMA_MODEL, user_message, fallback_prompt):
+                produced_output = True
+                yield fragment
+            return
+        except Exception as e2:
+            if produced_output:
+                logger.error(f"Fallback stream from {FALLBACK_OLLAMA_MODEL} failed mid-response: {e2}")
+                raise
+            logger.error(f"Fallback model also failed: {e2}")
+
+    yield f"Error calling local Ollama: {str(primary_error)}"
+
+
+async def warm_up_ollama_model_async(model: str) -> bool:
+    """Async warm_up_ollama_model(): load the model without generating anything"""
+    try:
+        response = await get_http_client().post(
+            f"{OLLAMA_URL}/api/generate",
+            json={"model": model, "keep_alive": OLLAMA_KEEP_ALIVE},
+            timeout=OLLAMA_WARMUP_TIMEOUT
+        )
+        response.raise_for_status()
+        return True
+    except Exception as e:
+        logger.warning(f"Ollama warm-up for {model} failed: {e}")
+        return False
+
+
+def schedule_ollama_warmup_async(model: str) -> None:
+    """Preload a model as a background task, at most once per OLLAMA_WARMUP_INTERVAL"""
+    if claim_ollama_warmup(model):
+        task = asyncio.create_task(warm_up_ollama_model_async(model))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+# =============================================================================
+# CLOUD PROVIDERS
+# =============================================================================
+
+@retry_with_backoff(
+    max_retries=UPSTREAM_MAX_RETRIES,
+    initial_delay=UPSTREAM_RETRY_INITIAL_DELAY,
+    max_delay=UPSTREAM_RETRY_MAX_DELAY,
+    retryable_exceptions=(httpx.TransportError, httpx.HTTPStatusError),
+    jitter=True,
+    budget=retry_budget,
+    should_retry=is_retryable
+)
+async def _post_with_retry_async(url: str, timeout: float, **kwargs) -> httpx.Response:
+    """Async _post_with_retry(): same retry policy, deadline and retry budget"""
+    response = await get_http_client().post(url, timeout=deadline_timeout(timeout), **kwargs)
+    response.raise_for_status()
+    return response
+
+
+@retry_with_backoff(
+    max_retries=UPSTREAM_MAX_RETRIES,
+    initial_delay=UPSTREAM_RETRY_INITIAL_DELAY,
+    max_delay=UPSTREAM_RETRY_MAX_DELAY,
+    retryable_exceptions=(httpx.ConnectError, httpx.ConnectTimeout),
+    jitter=True,
+    budget=retry_budget,
+    should_retry=is_retryable
+)
+async def _post_with_connect_retry_async(url: str, timeout: float, **kwargs) -> httpx.Response:
+    """Async _post_with_connect_retry(): provider completions are only retried when the connection failed"""
+    response = await get_http_client().post(url, timeout=deadline_timeout(timeout), **kwargs)
+    response.raise_for_status()
+    return response
+
+
+async def _call_provider_api_async(api_name: str, url: str, payload: dict,
+                                   extract_text: Callable[[dict], Optional[str]], headers: dict = None) -> str:
+    """POST to a cloud provider and return its text, or the same "Error: ..." strings as call_*_api"""
+    try:
+        response = await _post_with_connect_retry_async(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+
+        text = extract_text(response.json())
+        if text is not None:
+            return text
+
+        logger.error(f"{api_name} API returned unexpected response format")
+        return f"Error: Unexpected {api_name} response format"
+    except httpx.TimeoutException:
+        logger.error(f"{api_name} API request timed out")
+        return f"Error: {api_name} API request timed out"
+    except httpx.HTTPError as e:
+        logger.error(f"{api_name} API request failed: {type(e).__name__}")
+        return f"Error: {api_name} API request failed"
+    except Exception as e:
+        logger.error(f"Unexpected error calling {api_name} API: {type(e).__name__}")
+        return f"Error calling {api_name} API"
+
+
+def _claude_text(data: dict) -> Optional[str]:
+    """Text of an Anthropic messages response"""
+    if "content" in data and len(data["content"]) > 0:
+        return data["content"][0]["text"]
+    return None
+
+
+def _grok_text(data: dict) -> Optional[str]:
+    """Text of an OpenAI-style chat completion"""
+    if "choices" in data and len(data["choices"]) > 0:
+        return data["choices"][0]["message"]["content"]
+    return None
+
+
+def _gemini_text(data: dict) -> Optional[str]:
+    """Text of a generateContent response"""
+    if "candidates" in data and len(data["candidates"]) > 0:
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+    return None
+
+
+@track_api_call('claude', is_failure=is_error_reply)
+async def call_claude_api_async(prompt: str, system_prompt: str = "") -> str:
+    """Async call_claude_api()"""
+    if not ANTHROPIC_API_KEY:
+        logger.error("Claude API called but ANTHROPIC_API_KEY not configured")
+        return "Error: ANTHROPIC_API_KEY not configured"
+    headers, payload = claude_request(ANTHROPIC_API_KEY, prompt, system_prompt)
+    return await _call_provider_api_async(
+        "Claude", f"{ANTHROPIC_API_URL}/v1/messages", payload, _claude_text, headers=headers
+    )
+
+
+@track_api_call('grok', is_failure=is_error_reply)
+async def call_grok_api_async(prompt: str, system_prompt: str = "") -> str:
+    """Async call_grok_api()"""
+    if not XAI_API_KEY:
+        logger.error("Grok API called but XAI_API_KEY not configured")
+        return "Error: XAI_API_KEY not configured"
+    headers, payload = grok_request(XAI_API_KEY, prompt, system_prompt)
+    return await _call_provider_api_async(
+        "Grok", f"{XAI_API_URL}/v1/chat/completions", payload, _grok_text, headers=headers
+    )
+
+
+@track_api_call('gemini', is_failure=is_error_reply)
+async def call_gemini_api_async(prompt: str, system_prompt: str = "") -> str:
+    """Async call_gemini_api() (key goes in the query string, per Google's API design)"""
+    if not GOOGLE_AI_API_KEY:
+        logger.error("Gemini API called but GOOGLE_AI_API_KEY not configured")
+        return "Error: GOOGLE_AI_API_KEY not configured"
+    url = f"{GOOGLE_AI_API_URL}/v1beta/models/{GEMINI_MODEL}:generateContent?key={GOOGLE_AI_API_KEY}"
+    return await _call_provider_api_async("Gemini", url, gemini_payload(prompt, system_prompt), _gemini_text)
+
+
+async def _aiter_sse_data(response: httpx.Response) -> AsyncIterator[dict]:
+    """Yield the decoded JSON "data:" payloads of a server-sent events stream"""
+    async for line in response.aiter_lines():
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+async def _stream_provider_api_async(api_name: str, url: str, payload: dict,
+                                     extract_fragment: Callable[[dict], Optional[str]],
+                                     headers: dict = None) -> AsyncIterator[str]:
+    """Async _stream_provider_api(): same error strings before output, re-raise after"""
+    produced_output = False
+    try:
+        async with get_http_client().stream("POST", url, headers=headers, json=payload,
+                                            timeout=deadline_timeout(API_TIMEOUT)) as response:
+            response.raise_for_status()
+            async for data in _aiter_sse_data(response):
+                fragment = extract_fragment(data)
+                if fragment:
+                    produced_output = True
+                    yield fragment
+        if not produced_output:
+            logger.error(f"{api_name} API stream returned no content")
+            yield f"Error: Unexpected {api_name} response format"
+    except httpx.TimeoutException:
+        if produced_output:
+            raise
+        logger.error(f"{api_name} API request timed out")
+        yield f"Error: {api_name} API request timed out"
+    except httpx.HTTPError as e:
+        if produced_output:
+            raise
+        logger.error(f"{api_name} API request failed: {type(e).__name__}")
+        yield f"Error: {api_name} API request failed"
+    except Exception as e:
+        if produced_output:
+            raise
+        logger.error(f"Unexpected error calling {api_name} API: {type(e).__name__}")
+        yield f"Error calling {api_name} API"
+
+
+@track_api_call('claude', is_failure=is_error_reply)
+async def stream_claude_api_async(prompt: str, system_prompt: str = "") -> AsyncIterator[str]:
+    """Async stream_claude_api()"""
+    if not ANTHROPIC_API_KEY:
+        logger.error("Claude API called but ANTHROPIC_API_KEY not configured")
+        yield "Error: ANTHROPIC_API_KEY not configured"
+        return
+    headers, payload = claude_request(ANTHROPIC_API_KEY, prompt, system_prompt)
+    payload["stream"] = True
+    async for fragment in _stream_provider_api_async(
+        "Claude", f"{ANTHROPIC_API_URL}/v1/messages", payload, claude_stream_fragment, headers=headers
+    ):
+        yield fragment
+
+
+@track_api_call('grok', is_failure=is_error_reply)
+async def stream_grok_api_async(prompt: str, system_prompt: str = "") -> AsyncIterator[str]:
+    """Async stream_grok_api()"""
+    if not XAI_API_KEY:
+        logger.error("Grok API called but XAI_API_KEY not configured")
+        yield "Error: XAI_API_KEY not configured"
+        return
+    headers, payload = grok_request(XAI_API_KEY, prompt, system_prompt)
+    payload["stream"] = True
+    async for fragment in _stream_provider_api_async(
+        "Grok", f"{XAI_API_URL}/v1/chat/completions", payload, grok_stream_fragment, headers=headers
+    ):
+        yield fragment
+
+
+@track_api_call('gemini', is_failure=is_error_reply)
+async def stream_gemini_api_async(prompt: str, system_prompt: str = "") -> AsyncIterator[str]:
+    """Async stream_gemini_api()"""
+    if not GOOGLE_AI_API_KEY:
+        logger.error("Gemini API called but GOOGLE_AI_API_KEY not configured")
+        yield "Error: GOOGLE_AI_API_KEY not configured"
+        return
+    url = (f"{GOOGLE_AI_API_URL}/v1beta/models/{GEMINI_MODEL}:streamGenerateContent"
+           f"?alt=sse&key={GOOGLE_AI_API_KEY}")
+    async for fragment in _stream_provider_api_async(
+        "Gemini", url, gemini_payload(prompt, system_prompt), gemini_stream_fragment
+    ):
+        yield fragment
+
+
+# =============================================================================
+# MEMORY
+# =============================================================================
+
+def _letta_headers() -> dict:
+    """Auth headers for Letta requests"""
+    return {
+        "Authorization": f"Bearer {LETTA_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+def _letta_results(data) -> list:
+    """Memory list from a Letta response"""
+    # Handle different response formats
+    if isinstance(data, list):
+        return data
+    return data.get("memories", data.get("results", []))
+
+
+async def _letta_search_async(query: str, user_id: str, limit: int) -> list:
+    """Async _letta_search(): POST /memories/search and parse the results (raises on any failure)"""
+    response = await _post_with_retry_async(
+        f"{LETTA_BASE_URL}/memories/search",
+        headers=_letta_headers(),
+        json={"query": query, "user_id": user_id, "limit": limit},
+        timeout=LETTA_TIMEOUT
+    )
+    return _letta_results(response.json())
+
+
+async def letta_search_memories_async(query: str, user_id: str, limit: int = 5) -> list:
+    """Async letta_search_memories()"""
+    if not LETTA_API_KEY:
+        return []
+
+    # SECURITY FIX: user_id is required - no fallback
+    if not user_id:
+        logger.error("letta_search_memories_async called without user_id")
+        return []
+
+    try:
+        return await _letta_search_async(query, user_id, limit)
+    except Exception as e:
+        logger.error(f"Letta search error: {e}")
+        return []
+
+
+async def letta_get_all_memories_async(user_id: str) -> list:
+    """Async letta_get_all_memories()"""
+    if not LETTA_API_KEY:
+        return []
+
+    # SECURITY FIX: user_id is required - no fallback
+    if not user_id:
+        logger.error("letta_get_all_memories_async called without user_id")
+        return []
+
+    try:
+        response = await get_http_client().get(
+            f"{LETTA_BASE_URL}/memories",
+            params={"user_id": user_id},
+            headers={"Authorization": f"Bearer {LETTA_API_KEY}"},
+            timeout=LETTA_TIMEOUT
+        )
+        response.raise_for_status()
+        return _letta_results(response.json())
+    except Exception as e:
+        logger.error(f"Letta get all error: {e}")
+        return []
+
+
+async def _memory_server_recall_async(query: str) -> List[str]:
+    """Async _memory_server_recall(): POST /recall and return the documents (raises on any failure)"""
+    response = await _post_with_retry_async(
+        f"{MEMORY_URL}/recall",
+        json={"query": query, "n": 3},
+        timeout=LOCAL_SERVICE_TIMEOUT
+    )
+    return response.json().get("documents", [])
+
+
+async def _recall_local_async(query: str) -> List[str]:
+    """Query local ChromaDB via memory_server /recall (raises on failure, like _recall_local)"""
+    # Hedge the raising call, so a fast failure never beats a slower answer
+    return await hedged_call_async("memory_recall_local", _memory_server_recall_async, query)
+
+
+async def _recall_cloud_async(query: str, user_id: str) -> List[str]:
+    """Search Letta and normalize results to plain strings (raises on failure, like _recall_cloud)"""
+    if not LETTA_API_KEY:
+        return []
+
+    # SECURITY FIX: user_id is required - no fallback
+    if not user_id:
+        logger.error("_recall_cloud_async called without user_id")
+        return []
+
+    # Hedge the raising call, so a fast failure never beats a slower answer
+    return letta_memory_texts(await hedged_call_async("memory_recall_cloud", _letta_search_async, query, user_id, 3))
+
+
+@track_api_call('memory_recall')
+async def recall_memory_dual_async(query: str, user_id: str, budget: float = None) -> Dict[str, List[str]]:
+    """Async recall_memory_dual(): both backends concurrently under one budget
+
+    Unlike the threaded version in jessica_core, a
+    backend that misses the budget is actually cancelled (its HTTP request
+    is closed) rather than left running in the background.
+    """
+    cached = recall_cache.get(user_id, query)
+    if cached is not None:
+        return {source: list(texts) for source, texts in cached.items()}
+    generation = recall_cache.generation(user_id)
+
+    budget = MEMORY_RECALL_BUDGET if budget is None else budget
+    context = {"local": [], "cloud": []}
+
+    # Tasks copy the context, so both lookups inherit the budget as their deadline
+    with deadline_scope(budget):
+        tasks = {
+            asyncio.create_task(_recall_local_async(query)): "local",
+            asyncio.create_task(_recall_cloud_async(query, user_id)): "cloud",
+        }
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    failed = []
+    for task in done:
+        source = tasks[task]
+        try:
+            context[source] = task.result()
+        except Exception as e:
+            failed.append(source)
+            logger.error(f"{source.capitalize()} recall failed: {e}")
+
+    for task in pending:
+        task.cancel()
+        logger.warning(f"{tasks[task].capitalize()} recall exceeded {budget}s budget - skipping")
+
+    # Don't cache a result that is missing a backend that failed or ran out of time
+    if not pending and not failed:
+        recall_cache.put(user_id, query, {source: list(texts) for source, texts in context.items()}, generation)
+
+    return context
+
+
+# Memory writes run on memory_write_queue's worker threads, off the event loop,
+# with a blocking session of their own (same per-upstream pools and breakers)
+_write_session: Optional[requests.Session] = None
+_write_session_lock = threading.Lock()
+
+
+def _get_write_session() -> requests.Session:
+    """Session for the memory write workers, created on the first write"""
+    global _write_session
+    with _write_session_lock:
+        if _write_session is None:
+            _write_session = build_session(HTTP_UPSTREAMS)
+        return _write_session
+
+
+@retry_with_backoff(
+    max_retries=UPSTREAM_MAX_RETRIES,
+    initial_delay=UPSTREAM_RETRY_INITIAL_DELAY,
+    max_delay=UPSTREAM_RETRY_MAX_DELAY,
+    jitter=True,
+    budget=retry_budget,
+    should_retry=is_retryable
+)
+def _store_post(url: str, timeout: float, **kwargs) -> requests.Response:
+    """POST a memory_server store from a write worker (safe to repeat - fixed ids)"""
+    response = _get_write_session().post(url, timeout=timeout, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+@retry_with_backoff(
+    max_retries=UPSTREAM_MAX_RETRIES,
+    initial_delay=UPSTREAM_RETRY_INITIAL_DELAY,
+    max_delay=UPSTREAM_RETRY_MAX_DELAY,
+    jitter=True,
+    budget=retry_budget,
+    should_retry=is_unsent_error
+)
+def _letta_store_post(url: str, timeout: float, **kwargs) -> requests.Response:
+    """POST a Letta memory from a write worker, retrying only failed connects"""
+    response = _get_write_session().post(url, timeout=timeout, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def _store_memory_batch_sync(batch: List[tuple]) -> None:
+    """Store a coalesced batch of chat turns (see jessica_core._store_memory_batch_sync)
+
+    Args:
+        batch: List of (user_message, jessica_response, provider_used, user_id) tuples
+    """
+    records = []
+    for user_message, jessica_response, provider_used, user_id in batch:
+        # SECURITY FIX: user_id is required - no fallback
+        if not user_id:
+            logger.error("_store_memory_batch_sync got a write without user_id - skipping it")
+            continue
+        records.append(memory_record(user_message, jessica_response, provider_used, user_id))
+
+    if not records:
+        return
+
+    # Store in local ChromaDB - one request, one batched embedding pass
+    try:
+        _store_post(f"{MEMORY_URL}/store_batch", json=store_batch_payload(records), timeout=LOCAL_SERVICE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Local memory batch store failed ({len(records)} memories): {e}")
+
+    # Letta has no batch API, so each turn is added individually
+    if LETTA_API_KEY:
+        for _, memory_text, provider_used, user_id in records:
+            headers, payload = letta_request(
+                LETTA_API_KEY, memory_text, user_id, {"provider": provider_used, "source": "jessica_local"}
+            )
+            try:
+                _letta_store_post(f"{LETTA_BASE_URL}/memories", headers=headers, json=payload, timeout=LETTA_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Letta store failed: {e}")
+
+    # Recalls cached while the writes were queued no longer reflect these memories
+    for user_id in {record[3] for record in records}:
+        recall_cache.invalidate_user(user_id)
+
+
+def _store_memory_sync(user_message: str, jessica_response: str, provider_used: str, user_id: str) -> None:
+    """Store one chat turn (memory_write_queue's write function when batching is off)"""
+    _store_memory_batch_sync([(user_message, jessica_response, provider_used, user_id)])
+
+
+# Writes arriving within MEMORY_WRITE_BATCH_WINDOW are coalesced into one
+# /store_batch call; pending writes are flushed on shutdown
+memory_write_queue = MemoryWriteQueue(
+    _store_memory_batch_sync if MEMORY_WRITE_BATCH_SIZE > 1 else _store_memory_sync,
+    workers=MEMORY_WRITE_WORKERS,
+    max_queue_depth=MEMORY_WRITE_QUEUE_DEPTH,
+    enqueue_timeout=MEMORY_WRITE_ENQUEUE_TIMEOUT,
+    name="memory_store",
+    batch_size=MEMORY_WRITE_BATCH_SIZE,
+    batch_window=MEMORY_WRITE_BATCH_WINDOW
+)
+atexit.register(memory_write_queue.shutdown, MEMORY_WRITE_SHUTDOWN_TIMEOUT)
+
+
+async def store_memory_dual_async(user_message: str, jessica_response: str, provider_used: str, user_id: str) -> bool:
+    """Queue a memory write without blocking the event loop
+
+    memory_write_queue.submit() can wait up to MEMORY_WRITE_ENQUEUE_TIMEOUT
+    when the queue is full, so it runs in the default executor.
+
+    Returns:
+        True if the write was queued, False if it was dropped
+    """
+    if user_id:
+        recall_cache.invalidate_user(user_id)
+    return await asyncio.to_thread(memory_write_queue.submit, user_message, jessica_response, provider_used, user_id)
+
+
+# =============================================================================
+# CHAT PIPELINE
+# =============================================================================
+
+async def _prepare_chat_request_async(data: dict) -> dict:
+    """Async _prepare_chat_request(): recall runs while the message is routed"""
+    user_message, user_id, explicit_directive, active_model = parse_chat_body(data)
+
+    recall_task = asyncio.create_task(recall_memory_dual_async(user_message, user_id))
+    try:
+        command_intent, (provider, tier, reason) = route_message(user_message, explicit_directive)
+
+        # Preload the local model while recall is still in flight
+        if provider == "local":
+            schedule_ollama_warmup_async(active_model)
+
+        memory_context = await recall_task
+    except BaseException:
+        recall_task.cancel()
+        raise
+
+    return assemble_chat_request(user_message, user_id, active_model, command_intent,
+                                  (provider, tier, reason), memory_context)
+
+
+def _provider_call(chat_request: dict) -> Awaitable[str]:
+    """Awaitable answering a prepared chat request with its routed provider"""
+    user_message = chat_request["user_message"]
+    provider_map = {
+        "local": lambda: call_local_ollama_async(chat_request["local_ollama_prompt"], user_message,
+                                                 model=chat_request["active_model"],
+                                                 fallback_system_prompt=chat_request["fallback_ollama_prompt"]),
+        "claude": lambda: call_claude_api_async(user_message, chat_request["claude_system_prompt"]),
+        "grok": lambda: call_grok_api_async(user_message, chat_request["grok_system_prompt"]),
+        "gemini": lambda: call_gemini_api_async(chat_request["gemini_user_message"], chat_request["gemini_system_prompt"])
+    }
+    return provider_map.get(chat_request["provider"], provider_map["local"])()
+
+
+def _provider_stream(chat_request: dict) -> AsyncIterator[str]:
+    """Fragment stream answering a prepared chat request with its routed provider"""
+    user_message = chat_request["user_message"]
+    stream_map = {
+        "local": lambda: stream_local_ollama_async(chat_request["local_ollama_prompt"], user_message,
+                                                   model=chat_request["active_model"],
+                                                   fallback_system_prompt=chat_request["fallback_ollama_prompt"]),
+        "claude": lambda: stream_claude_api_async(user_message, chat_request["claude_system_prompt"]),
+        "grok": lambda: stream_grok_api_async(user_message, chat_request["grok_system_prompt"]),
+        "gemini": lambda: stream_gemini_api_async(chat_request["gemini_user_message"], chat_request["gemini_system_prompt"])
+    }
+    return stream_map.get(chat_request["provider"], stream_map["local"])()
+
+
+def _ndjson_stream_response_async(fragments: AsyncIterator[str], request_id: str,
+                                  on_complete: Callable[[str], Awaitable[dict]] = None) -> StreamingResponse:
+    """Async _ndjson_stream_response(): same token/done/error chunks and deadline"""
+    deadline = current_deadline()
+
+    async def generate():
+        parts = []
+        try:
+            async for fragment in aiter_with_deadline(fragments, deadline):
+                parts.append(fragment)
+                yield stream_event("token", content=fragment)
+        except Exception as e:
+            logger.error(f"Stream failed: {type(e).__name__}: {str(e)}")
+            yield stream_event("error", error="Stream interrupted", error_code="STREAM_ERROR",
+                                request_id=request_id)
+            return
+
+        response_text = "".join(parts)
+        extra_fields = await on_complete(response_text) if on_complete else {"request_id": request_id}
+        yield stream_event("done", response=response_text, **extra_fields)
+
+    return StreamingResponse(
+        generate(),
+        media_type='application/x-ndjson',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _chat_stream_response_async(chat_request: dict, request_id: str) -> StreamingResponse:
+    """Stream the routed provider's answer, storing memory once it is complete"""
+    async def on_complete(response_text: str) -> dict:
+        await store_memory_dual_async(chat_request["user_message"], response_text,
+                                      chat_request["provider"], chat_request["user_id"])
+        return build_chat_metadata(chat_request, request_id)
+
+    return _ndjson_stream_response_async(_provider_stream(chat_request), request_id, on_complete)
+
+
+# =============================================================================
+# REQUEST HANDLING
+# =============================================================================
+
+# Same limits and key as the Flask app's flask-limiter setup (fixed window, in memory)
+_rate_limiter = FixedWindowRateLimiter(MemoryStorage())
+
+
+def _error_response(message: str, error_code: str, status_code: int, request_id: str) -> JSONResponse:
+    """JSON error body in the same shape as the Flask app's"""
+    return JSONResponse({"error": message, "error_code": error_code, "request_id": request_id},
+                        status_code=status_code)
+
+
+def endpoint(rate_limit: str = RATE_LIMIT_CHAT):
+    """Decorator for route handlers: request ID, rate limit and error mapping
+
+    Mirrors the Flask app: X-Request-ID (or a fresh short ID) is stored on
+    request.state.request_id, the rate limit is per route and keyed by
+    get_rate_limit_key(), exceptions become the same JSON error bodies and
+    the response time is recorded in PerformanceMetrics.
+    """
+    limit_item = parse_rate_limit(rate_limit)
+
+    def decorator(handler: Callable[[Request], Awaitable]) -> Callable[[Request], Awaitable]:
+        @functools.wraps(handler)
+        async def wrapper(request: Request):
+            request_id = request.headers.get('X-Request-ID', str(uuid.uuid4())[:8])
+            request.state.request_id = request_id
+            logger.info(f"Request started: {request.method} {request.url.path}")
+
+            start_time = time.time()
+            if not _rate_limiter.hit(limit_item, handler.__name__, get_rate_limit_key()):
+                metrics.record_endpoint(request.url.path, time.time() - start_time, 429)
+                return _error_response(f"Rate limit exceeded: {rate_limit}", "RATE_LIMIT_EXCEEDED", 429, request_id)
+
+            try:
+                response = await handler(request)
+            except ValidationError as e:
+                logger.warning(f"Validation error in {request.url.path}: {e.message}")
+                response = _error_response(e.message, e.error_code, e.status_code, request_id)
+            except APIError as e:
+                logger.error(f"Service error in {request.url.path}: {e.message}")
+                response = _error_response(e.message, e.error_code, e.status_code, request_id)
+            except Exception as e:
+                logger.error(f"Unexpected error in {request.url.path}: {type(e).__name__}: {str(e)}", exc_info=True)
+                response = _error_response("An unexpected error occurred", "INTERNAL_ERROR", 500, request_id)
+            metrics.record_endpoint(request.url.path, time.time() - start_time, response.status_code)
+            return response
+        return wrapper
+    return decorator
+
+
+async def _json_body(request: Request) -> Optional[dict]:
+    """Parsed JSON object body, or None if the body is missing or not a JSON object"""
+    try:
+        data = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _validate_proxy_message(data: Optional[dict]) -> tuple:
+    """Validate a proxy request body, returning (message, system_prompt)"""
+    if not data:
+        raise ValidationError("Request body must be JSON")
+
+    message = data.get('message', '')
+    system_prompt = data.get('system_prompt', '')
+
+    if not isinstance(message, str) or len(message.strip()) == 0:
+        raise ValidationError("Message must be a non-empty string")
+    if len(message) > 10000:
+        raise ValidationError("Message too long (max 10,000 characters)")
+
+    return message, system_prompt
+
+
+# =============================================================================
+# ROUTES
+# =============================================================================
+
+@endpoint(RATE_LIMIT_CHAT)
+@deadline_scope(CHAT_REQUEST_DEADLINE)
+async def chat(request: Request):
+    """Main chat endpoint - same body and response as jessica_core /chat"""
+    data = await _json_body(request)
+    chat_request = await _prepare_chat_request_async(data)
+    request_id = request.state.request_id
+
+    # "stream": true switches /chat to the same NDJSON stream as /chat/stream
+    if data.get('stream'):
+        return _chat_stream_response_async(chat_request, request_id)
+
+    response_text = await _provider_call(chat_request)
+
+    # Non-blocking memory storage with user isolation
+    await store_memory_dual_async(chat_request["user_message"], response_text,
+                                  chat_request["provider"], chat_request["user_id"])
+
+    return JSONResponse({"response": response_text, **build_chat_metadata(chat_request, request_id)})
+
+
+@endpoint(RATE_LIMIT_CHAT)
+@deadline_scope(CHAT_REQUEST_DEADLINE)
+async def chat_stream(request: Request):
+    """Streaming chat endpoint - equivalent to /chat with "stream": true"""
+    chat_request = await _prepare_chat_request_async(await _json_body(request))
+    return _chat_stream_response_async(chat_request, request.state.request_id)
+
+
+@endpoint(RATE_LIMIT_CHAT)
+async def search_cloud_memory(request: Request):
+    """Search cloud memories via Letta - uses single-user constant"""
+    data = await _json_body(request)
+    if not data:
+        raise ValidationError("Request body must be JSON")
+
+    results = await letta_search_memories_async(data.get('query', ''), USER_ID)
+    return JSONResponse({"results": results})
+
+
+@endpoint(RATE_LIMIT_CHAT)
+async def get_all_cloud_memories(request: Request):
+    """Get all cloud memories via Letta - uses single-user constant"""
+    return JSONResponse({"results": await letta_get_all_memories_async(USER_ID)})
+
+
+async def _check_service(name: str, url: str, hedge_name: str) -> dict:
+    """Health-check one local service for /status (hedged under `hedge_name` when HEDGED_REQUESTS=1)"""
+    try:
+        start_time = time.time()
+        r = await hedged_call_async(hedge_name, get_http_client().get, url, timeout=HEALTH_CHECK_TIMEOUT)
+        response_time = (time.time() - start_time) * 1000
+        return {"available": r.status_code == 200, "response_time_ms": round(response_time, 2), "error": None}
+    except Exception as e:
+        logger.error(f"{name} status check failed: {e}")
+        return {"available": False, "response_time_ms": None, "error": str(e)}
+
+
+@endpoint(RATE_LIMIT_CHAT)
+async def status(request: Request):
+    """Health check endpoint with detailed service status"""
+    # Both local services are checked concurrently
+    ollama_status, memory_status = await asyncio.gather(
+        _check_service("Ollama", f"{OLLAMA_URL}/api/tags", "ollama_health"),
+        _check_service("Memory service", f"{MEMORY_URL}/health", "memory_health"),
+    )
+    return JSONResponse({
+        "local_ollama": ollama_status,
+        "local_memory": memory_status,
+        "claude_api": {"configured": bool(ANTHROPIC_API_KEY)},
+        "grok_api": {"configured": bool(XAI_API_KEY)},
+        "gemini_api": {"configured": bool(GOOGLE_AI_API_KEY)},
+        "letta_api": {"configured": bool(LETTA_API_KEY)},
+        "mem0_api": {"configured": bool(MEM0_API_KEY)},  # Deprecated - kept for migration period
+        "memory_write_queue": memory_write_queue.get_stats(),
+        "recall_cache": recall_cache.get_stats(),
+        "routing_cache": get_routing_cache_stats(),
+        "circuit_breakers": get_breaker_stats(),
+        "retry_budget": retry_budget.get_stats(),
+        "hedging": get_hedge_stats(),
+        "request_id": request.state.request_id
+    })
+
+
+@endpoint(RATE_LIMIT_CHAT)
+async def get_modes(request: Request):
+    """Return available Jessica modes and their descriptions"""
+    return JSONResponse(modes_info())
+
+
+def _metrics_extra() -> dict:
+    """Samples for /metrics owned by the queues and caches rather than PerformanceMetrics"""
+    write_queue = memory_write_queue.get_stats()
+    log_stats = get_logging_stats()
+    return {
+        "jessica_memory_write_queue_depth": ("gauge", "Memory writes waiting to be stored", write_queue["queue_depth"]),
+        "jessica_memory_write_dropped_total": ("counter", "Memory writes dropped on a full queue", write_queue["dropped"]),
+        "jessica_memory_write_failed_total": ("counter", "Memory writes that failed", write_queue["failed"]),
+        "jessica_recall_cache_entries": ("gauge", "Cached memory recall results", recall_cache.get_stats()["size"]),
+        "jessica_routing_cache_entries": ("gauge", "Memoized routing decisions", get_routing_cache_stats()["size"]),
+        "jessica_log_queue_depth": ("gauge", "Log records waiting for the listener thread", log_stats["queue_depth"]),
+        "jessica_log_records_dropped_total": ("counter", "Log records dropped on a full log queue", log_stats["dropped"]),
+        "jessica_log_records_sampled_out_total": ("counter", "INFO/DEBUG log records skipped by sampling", log_stats["sampled_out"]),
+    }
+
+
+@endpoint(RATE_LIMIT_CHAT)
+async def get_metrics(request: Request):
+    """Performance metrics in Prometheus text format (or JSON with ?format=json)"""
+    if request.query_params.get('format') == 'json':
+        return JSONResponse({"success": True, "metrics": metrics.get_stats(),
+                             "request_id": request.state.request_id})
+    return Response(metrics.render_prometheus(_metrics_extra()), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@endpoint(RATE_LIMIT_PROXY)
+async def route(request: Request):
+    """Routing decisions for a batch of messages - no provider is called"""
+    messages, explicit_directive = parse_route_body(await _json_body(request))
+    return JSONResponse({
+        "results": route_messages(messages, explicit_directive),
+        "request_id": request.state.request_id
+    })
+
+
+@deadline_scope(CHAT_REQUEST_DEADLINE)
+async def _proxy_response(request: Request, call_func: Callable[[str, str], Awaitable[str]],
+                          stream_func: Callable[[str, str], AsyncIterator[str]]):
+    """Shared /api/proxy/* body - calls the provider server-side using the backend API key"""
+    data = await _json_body(request)
+    message, system_prompt = _validate_proxy_message(data)
+    request_id = request.state.request_id
+
+    # Stream mode: same NDJSON chunk format as /chat/stream
+    if data.get('stream'):
+        return _ndjson_stream_response_async(stream_func(message, system_prompt), request_id)
+
+    return JSONResponse({"response": await call_func(message, system_prompt), "request_id": request_id})
+
+
+@endpoint(RATE_LIMIT_PROXY)
+async def proxy_claude(request: Request):
+    """Proxy endpoint for Claude API"""
+    return await _proxy_response(request, call_claude_api_async, stream_claude_api_async)
+
+
+@endpoint(RATE_LIMIT_PROXY)
+async def proxy_grok(request: Request):
+    """Proxy endpoint for Grok API"""
+    return await _proxy_response(request, call_grok_api_async, stream_grok_api_async)
+
+
+@endpoint(RATE_LIMIT_PROXY)
+async def proxy_gemini(request: Request):
+    """Proxy endpoint for Gemini API"""
+    return await _proxy_response(request, call_gemini_api_async, stream_gemini_api_async)
+
+
+# =============================================================================
+# APP
+# =============================================================================
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    resource_sampler.ensure_started()
+    yield
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+app = Starlette(
+    routes=[
+        Route('/chat', chat, methods=['POST']),
+        Route('/chat/stream', chat_stream, methods=['POST']),
+        Route('/memory/cloud/search', search_cloud_memory, methods=['POST']),
+        Route('/memory/cloud/all', get_all_cloud_memories, methods=['GET']),
+        Route('/status', status, methods=['GET']),
+        Route('/modes', get_modes, methods=['GET']),
+        Route('/metrics', get_metrics, methods=['GET']),
+        Route('/route', route, methods=['POST']),
+        Route('/api/proxy/claude', proxy_claude, methods=['POST']),
+        Route('/api/proxy/grok', proxy_grok, methods=['POST']),
+        Route('/api/proxy/gemini', proxy_gemini, methods=['POST']),
+    ],
+    middleware=[
+        # SECURITY FIX: Restrict CORS to specific origins only (same as the Flask app)
+        Middleware(
+            CORSMiddleware,
+            allow_origins=["http://localhost:3000", "https://localhost:3000"],
+            allow_credentials=True,
+            allow_methods=["GET", "POST", "OPTIONS"],
+            allow_headers=["Content-Type", "Authorization", "X-Request-ID", "X-User-ID"]
+        )
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    logger.info("Starting Jessica Core (ASGI) on 0.0.0.0:8000")
+    uvicorn.run(app, host='0.0.0.0', port=8000)
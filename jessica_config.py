@@ -0,0 +1,164 @@
+"""
+Configuration for Jessica Core
+Environment-driven settings shared by the Flask app (jessica_core.py) and
+the async app (jessica_async.py)
+"""
+
+import os
+from dotenv import load_dotenv
+
+from http_pools import UpstreamPoolConfig
+
+# Load environment variables from .env file BEFORE accessing them
+# This fixes the issue where bashrc exports don't reach non-interactive shells
+load_dotenv()
+
+# =============================================================================
+# SINGLE-USER CONFIGURATION
+# =============================================================================
+# Single-user system: Set your user ID here
+USER_ID = "PhyreBug"
+
+# Rate limiting configuration
+# Single-user system: Rate limiting uses constant USER_ID
+def get_rate_limit_key():
+    """Get rate limit key - single-user system uses constant"""
+    return f"user:{USER_ID}"
+
+# Rate limit configuration from environment variables
+RATE_LIMIT_CHAT = os.getenv("RATE_LIMIT_CHAT", "60 per minute")
+RATE_LIMIT_PROXY = os.getenv("RATE_LIMIT_PROXY", "100 per minute")
+
+# =============================================================================
+# SERVICE ENDPOINTS
+# =============================================================================
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+MEMORY_URL = os.getenv("MEMORY_URL", "http://localhost:5001")
+# Cloud API base URLs - overridable so benchmarks can point at local stand-ins
+ANTHROPIC_API_URL = os.getenv("ANTHROPIC_API_URL", "https://api.anthropic.com")
+XAI_API_URL = os.getenv("XAI_API_URL", "https://api.x.ai")
+GOOGLE_AI_API_URL = os.getenv("GOOGLE_AI_API_URL", "https://generativelanguage.googleapis.com")
+
+# =============================================================================
+# API KEYS (from environment)
+# =============================================================================
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+XAI_API_KEY = os.getenv("XAI_API_KEY")
+GOOGLE_AI_API_KEY = os.getenv("GOOGLE_AI_API_KEY")
+MEM0_API_KEY = os.getenv("MEM0_API_KEY")
+ZO_API_KEY = os.getenv("ZO_API_KEY")  # Optional - Zo Computer integration
+
+# =============================================================================
+# MEM0 CONFIGURATION
+# =============================================================================
+MEM0_BASE_URL = os.getenv("MEM0_BASE_URL", "https://api.mem0.ai/v1")
+
+# =============================================================================
+# LETTA CONFIGURATION
+# =============================================================================
+LETTA_API_KEY = os.getenv("LETTA_API_KEY")
+LETTA_BASE_URL = os.getenv("LETTA_BASE_URL", "https://api.letta.ai/v1")
+LETTA_TIMEOUT = int(os.getenv("LETTA_TIMEOUT", "30"))
+
+# =============================================================================
+# CONNECTION POOLS
+# =============================================================================
+# One adapter per upstream, so a burst of Ollama calls can't exhaust the pool
+# the cloud providers use (and vice versa). pool_maxsize is the number of
+# connections kept alive per host; more concurrent calls than that open
+# throwaway connections (and a fresh TLS handshake for cloud APIs).
+HTTP_POOL_MAXSIZE_LOCAL = int(os.getenv("HTTP_POOL_MAXSIZE_LOCAL", "32"))   # Ollama, memory_server
+HTTP_POOL_MAXSIZE_CLOUD = int(os.getenv("HTTP_POOL_MAXSIZE_CLOUD", "20"))   # Anthropic, xAI, Google, Letta, Mem0
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "0") == "1"                  # wait for a free connection instead
+HTTP_KEEPALIVE_IDLE = int(os.getenv("HTTP_KEEPALIVE_IDLE", "60"))           # TCP keep-alive probe after N idle seconds
+
+
+def _pool(name: str, prefix: str, maxsize_default: int, circuit_breaker: str = None) -> UpstreamPoolConfig:
+    """Pool config for one upstream; HTTP_POOL_MAXSIZE_<NAME> overrides the size"""
+    return UpstreamPoolConfig(
+        name=name,
+        prefix=prefix,
+        pool_maxsize=int(os.getenv(f"HTTP_POOL_MAXSIZE_{name.upper()}", str(maxsize_default))),
+        pool_block=HTTP_POOL_BLOCK,
+        keepalive_idle=HTTP_KEEPALIVE_IDLE,
+        circuit_breaker=circuit_breaker
+    )
+
+
+# Each upstream but Mem0 (deprecated) has a circuit breaker: once it is down,
+# calls fail in milliseconds instead of waiting out OLLAMA_TIMEOUT/LETTA_TIMEOUT
+HTTP_UPSTREAMS = [
+    _pool("ollama", OLLAMA_URL, HTTP_POOL_MAXSIZE_LOCAL, circuit_breaker="ollama"),
+    _pool("memory", MEMORY_URL, HTTP_POOL_MAXSIZE_LOCAL, circuit_breaker="memory_server"),
+    _pool("anthropic", ANTHROPIC_API_URL, HTTP_POOL_MAXSIZE_CLOUD, circuit_breaker="anthropic"),
+    _pool("xai", XAI_API_URL, HTTP_POOL_MAXSIZE_CLOUD, circuit_breaker="xai"),
+    _pool("google", GOOGLE_AI_API_URL, HTTP_POOL_MAXSIZE_CLOUD, circuit_breaker="gemini"),
+    _pool("letta", LETTA_BASE_URL, HTTP_POOL_MAXSIZE_CLOUD, circuit_breaker="letta"),
+    _pool("mem0", MEM0_BASE_URL, HTTP_POOL_MAXSIZE_CLOUD),
+]
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+DEFAULT_MAX_TOKENS = 2048
+MEMORY_TRUNCATE_LENGTH = 200
+# Primary: jessica (custom model with master_prompt baked in - no system prompt needed!)
+# Fallback: dolphin-llama3:8b (if custom model unavailable) - fits 16GB VRAM
+DEFAULT_OLLAMA_MODEL = "jessica"
+FALLBACK_OLLAMA_MODEL = "dolphin-llama3:8b"
+
+# Cloud provider models
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+GROK_MODEL = "grok-beta"
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Jessica Modes - different specialized models for different contexts
+# NOTE: Using jessica (10.7B) for all modes until 64GB RAM upgrade
+JESSICA_MODES = {
+    "default": "jessica",  # Custom model with personality baked in
+    "fast": "jessica",  # Same model (fits 16GB VRAM)
+    "important": "jessica",  # Same model until RAM upgrade
+    "business": "jessica-business", # WyldePhyre operations focus
+    # Future modes:
+    # "writing": "jessica-writing",   # Nexus Arcanum creative writing
+    # "crisis": "jessica-crisis",     # Mental health crisis support
+}
+
+# Timeouts (configurable via environment variables)
+API_TIMEOUT = int(os.getenv("API_TIMEOUT", "60"))
+# Increased timeout for memory operations - ONNX embedding model loading can take 10-15s on first use
+LOCAL_SERVICE_TIMEOUT = int(os.getenv("LOCAL_SERVICE_TIMEOUT", "20"))
+HEALTH_CHECK_TIMEOUT = int(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "300"))  # 5 min for 32B model first load
+MEM0_TIMEOUT = int(os.getenv("MEM0_TIMEOUT", "30"))
+# Shared latency budget for the concurrent ChromaDB + Letta recall on every /chat
+MEMORY_RECALL_BUDGET = float(os.getenv("MEMORY_RECALL_BUDGET", str(LOCAL_SERVICE_TIMEOUT)))
+# Whole-request deadline for /chat and the proxy endpoints: retries and per-call
+# timeouts are cut short so a request never runs past it (0 disables)
+CHAT_REQUEST_DEADLINE = float(os.getenv("CHAT_REQUEST_DEADLINE", str(OLLAMA_TIMEOUT + LOCAL_SERVICE_TIMEOUT)))
+# Retries for provider APIs, Letta and memory_server (decorrelated jitter, shared retry budget).
+# Provider completions and Letta writes are only retried when the connection failed.
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+UPSTREAM_RETRY_INITIAL_DELAY = float(os.getenv("UPSTREAM_RETRY_INITIAL_DELAY", "0.25"))
+UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("UPSTREAM_RETRY_MAX_DELAY", "2"))
+# Recall result cache: repeated queries within the TTL skip both backends (0 disables)
+RECALL_CACHE_TTL = float(os.getenv("RECALL_CACHE_TTL", "30"))
+RECALL_CACHE_SIZE = int(os.getenv("RECALL_CACHE_SIZE", "512"))
+# Memoized routing decisions, keyed by normalized message (0 disables)
+ROUTING_CACHE_SIZE = int(os.getenv("ROUTING_CACHE_SIZE", "4096"))
+# Maximum messages per /route call
+ROUTE_BATCH_MAX = int(os.getenv("ROUTE_BATCH_MAX", "1000"))
+
+# Background memory writes: bounded worker pool + queue (see memory_writer.py)
+MEMORY_WRITE_WORKERS = int(os.getenv("MEMORY_WRITE_WORKERS", "2"))
+MEMORY_WRITE_QUEUE_DEPTH = int(os.getenv("MEMORY_WRITE_QUEUE_DEPTH", "256"))
+MEMORY_WRITE_ENQUEUE_TIMEOUT = float(os.getenv("MEMORY_WRITE_ENQUEUE_TIMEOUT", "1.0"))
+MEMORY_WRITE_SHUTDOWN_TIMEOUT = float(os.getenv("MEMORY_WRITE_SHUTDOWN_TIMEOUT", "30"))
+MEMORY_WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "16"))
+MEMORY_WRITE_BATCH_WINDOW = float(os.getenv("MEMORY_WRITE_BATCH_WINDOW", "0.2"))  # seconds
+
+# Ollama warm-up: preload the routed model so a cold load overlaps memory recall
+OLLAMA_WARMUP_ENABLED = os.getenv("OLLAMA_WARMUP_ENABLED", "1") == "1"
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_WARMUP_INTERVAL = float(os.getenv("OLLAMA_WARMUP_INTERVAL", "60"))  # min seconds between pings per model
+OLLAMA_WARMUP_TIMEOUT = float(os.getenv("OLLAMA_WARMUP_TIMEOUT", "30"))  # seconds; a warm-up never holds its thread longer
@@ -0,0 +1,224 @@
+"""
+Buffered file sink and agent debug tracing for Jessica Core
+Request threads enqueue records; one writer thread appends them to a long-lived file handle
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Agent debug tracing (NDJSON) - off unless ENABLE_AGENT_LOGGING=1
+ENABLE_AGENT_LOGGING = os.getenv("ENABLE_AGENT_LOGGING", "0") == "1"
+AGENT_LOG_PATH = os.getenv("AGENT_LOG_PATH", "/home/phyre/jessica-core/.cursor/debug.log")
+# Fraction of agent_log events written (1.0 = all); sampling happens before anything is queued
+AGENT_LOG_SAMPLE_RATE = float(os.getenv("AGENT_LOG_SAMPLE_RATE", "1.0"))
+
+# Sentinel telling the writer thread to exit
+_STOP = object()
+
+
+def _json_line(record: Any) -> str:
+    return json.dumps(record, default=str)
+
+
+class BufferedLogSink:
+    """
+    Append-only NDJSON file written by a single background thread
+
+    write() never touches the filesystem: it puts the record on a bounded
+    queue and returns. The writer thread formats whatever has queued up,
+    writes it to one file handle that stays open, and flushes once per
+    batch. When the queue is full, records are dropped and counted rather
+    than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue_depth: int = 10000,
+        batch_size: int = 512,
+        formatter: Callable[[Any], str] = _json_line,
+        name: str = "log-sink"
+    ):
+        """
+        Args:
+            path: File to append to (parent directories are created)
+            max_queue_depth: Maximum records waiting to be written
+            batch_size: Maximum records written per flush
+            formatter: Turns a queued record into one line (run on the writer thread)
+            name: Writer thread name
+        """
+        self.path = path
+        self.max_queue_depth = max_queue_depth
+        self.batch_size = max(1, batch_size)
+        self.formatter = formatter
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=max_queue_depth)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._file = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        """Start the writer thread on first use (no threads at import time)"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._writer, name=self.name, daemon=True)
+            self._thread.start()
+
+    def write(self, record: Any) -> bool:
+        """
+        Queue one record
+
+        Returns:
+            True if queued, False if dropped because the queue is full
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _writer(self):
+        """Writer loop: block for one record, then take whatever else is queued"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is _STOP for record in batch)
+            try:
+                self._write_batch([record for record in batch if record is not _STOP])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._close_file()
+                return
+
+    def _write_batch(self, records: List[Any]):
+        if not records:
+            return
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter(record) + "\n")
+            except Exception:
+                self.failed += 1
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(lines))
+            self._file.flush()
+            self.written += len(lines)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(lines)
+            logger.warning(f"{self.name} write to {self.path} failed: {type(e).__name__}: {e}")
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued record has been written
+
+        Args:
+            timeout: Maximum seconds to wait (None = wait forever)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if deadline is None:
+                    self._queue.all_tasks_done.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write what is queued, stop the writer thread and close the file"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning(f"{self.name} close timed out with {self._queue.qsize()} records pending")
+            return
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get sink statistics
+
+        Returns:
+            Dictionary with queue depth and written/dropped/failed counters
+        """
+        return {
+            'path': self.path,
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+        }
+
+
+agent_log_sink = BufferedLogSink(AGENT_LOG_PATH, name="agent-log")
+atexit.register(agent_log_sink.close)
+
+
+def agent_log(location: str, message: str, data: dict = None, session_id: str = "debug-session",
+              run_id: str = "default", hypothesis_id: str = "A"):
+    """Queue one debug trace event - a no-op unless ENABLE_AGENT_LOGGING is set
+
+    Events are sampled at AGENT_LOG_SAMPLE_RATE and written as NDJSON to
+    AGENT_LOG_PATH by agent_log_sink's writer thread.
+    """
+    if not ENABLE_AGENT_LOGGING:
+        return
+    if AGENT_LOG_SAMPLE_RATE < 1.0 and random.random() >= AGENT_LOG_SAMPLE_RATE:
+        return
+    agent_log_sink.write({
+        "sessionId": session_id,
+        "runId": run_id,
+        "hypothesisId": hypothesis_id,
+        "location": location,
+        "message": message,
+        "data": data or {},
+        "timestamp": int(time.time() * 1000)
+    })
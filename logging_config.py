@@ -1,189 +1,487 @@
-"""
-Centralized logging configuration for Jessica Core
-Provides structured JSON logging with rotation and performance tracking
-"""
-
-import logging
-import logging.handlers
-import json
-import time
-import os
-from datetime import datetime
-from pathlib import Path
-from flask import g
-from typing import Optional
-
-
-# Create logs directory if it doesn't exist
-LOGS_DIR = Path("logs")
-LOGS_DIR.mkdir(exist_ok=True)
-
-
-class JSONFormatter(logging.Formatter):
-    """
-    Formatter that outputs JSON strings
-    Makes logs easily parseable for analysis tools
-    """
-    
-    def format(self, record: logging.LogRecord) -> str:
-        """Format log record as JSON"""
-        # Get request_id from Flask g object or record
-        request_id = getattr(record, 'request_id', None)
-        if not request_id:
-            try:
-                from flask import g
-                request_id = getattr(g, 'request_id', 'N/A')
-            except (RuntimeError, AttributeError):
-                request_id = 'N/A'
-        
-        # Build base log structure
-        log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'level': record.levelname,
-            'logger': record.name,
-            'message': record.getMessage(),
-            'request_id': request_id,
-            'module': record.module,
-            'function': record.funcName,
-            'line': record.lineno,
-        }
-        
-        # Add exception info if present
-        if record.exc_info:
-            log_data['exception'] = self.formatException(record.exc_info)
-        
-        # Add any extra fields
-        for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'created', 'filename', 'funcName', 
-                          'levelname', 'levelno', 'lineno', 'module', 'msecs', 
-                          'pathname', 'process', 'processName', 'relativeCreated',
-                          'thread', 'threadName', 'exc_info', 'exc_text', 'stack_info',
-                          'request_id', 'message']:
-                log_data[key] = value
-        
-        return json.dumps(log_data)
-
-
-class HumanReadableFormatter(logging.Formatter):
-    """
-    Formatter for console output that's easier to read
-    """
-    
-    def format(self, record: logging.LogRecord) -> str:
-        """Format log record for human readability"""
-        # Get request_id
-        request_id = getattr(record, 'request_id', None)
-        if not request_id:
-            try:
-                from flask import g
-                request_id = getattr(g, 'request_id', 'N/A')
-            except (RuntimeError, AttributeError):
-                request_id = 'N/A'
-        
-        # Color codes for different levels
-        colors = {
-            'DEBUG': '\033[36m',    # Cyan
-            'INFO': '\033[32m',     # Green
-            'WARNING': '\033[33m',  # Yellow
-            'ERROR': '\033[31m',    # Red
-            'CRITICAL': '\033[35m', # Magenta
-        }
-        reset_color = '\033[0m'
-        
-        # Get color for this level
-        color = colors.get(record.levelname, '')
-        
-        # Format timestamp
-        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Build log line
-        log_line = (
-            f"{color}{record.levelname:8s}{reset_color} "
-            f"{timestamp} "
-            f"[{request_id:8s}] "
-            f"{record.name:20s} "
-            f"{record.getMessage()}"
-        )
-        
-        # Add exception if present
-        if record.exc_info:
-            log_line += f"\n{self.formatException(record.exc_info)}"
-        
-        return log_line
-
-
-def setup_logging(
-    log_level: str = 'INFO',
-    json_logs: bool = True,
-    console_output: bool = True,
-    log_file: Optional[str] = None
-) -> logging.Logger:
-    """
-    Setup logging configuration for Jessica Core
-    
-    Args:
-        log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        json_logs: Whether to use JSON format for file logs
-        console_output: Whether to output to console
-        log_file: Optional specific log file path (defaults to logs/jessica-core.log)
-    
-    Returns:
-        Configured logger instance
-    """
-    # Get root logger
-    logger = logging.getLogger('jessica')
-    logger.setLevel(getattr(logging, log_level.upper()))
-    logger.handlers.clear()
-    
-    # Console handler (human-readable)
-    if console_output:
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_handler.setFormatter(HumanReadableFormatter())
-        logger.addHandler(console_handler)
-    
-    # File handler with rotation (JSON format)
-    if log_file is None:
-        log_file = LOGS_DIR / 'jessica-core.log'
-    
-    file_handler = logging.handlers.RotatingFileHandler(
-        log_file,
-        maxBytes=10 * 1024 * 1024,  # 10 MB
-        backupCount=10,  # Keep 10 old files
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.DEBUG)
-    
-    if json_logs:
-        file_handler.setFormatter(JSONFormatter())
-    else:
-        file_handler.setFormatter(HumanReadableFormatter())
-    
-    logger.addHandler(file_handler)
-    
-    # Error file handler (separate file for errors only)
-    error_handler = logging.handlers.RotatingFileHandler(
-        LOGS_DIR / 'jessica-errors.log',
-        maxBytes=10 * 1024 * 1024,  # 10 MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(JSONFormatter() if json_logs else HumanReadableFormatter())
-    logger.addHandler(error_handler)
-    
-    return logger
-
-
-def get_logger(name: str) -> logging.Logger:
-    """
-    Get a child logger for a specific module
-    
-    Args:
-        name: Module name
-    
-    Returns:
-        Logger instance
-    """
-    return logging.getLogger(f'jessica.{name}')
-
+"""
+Centralized logging configuration for Jessica Core
+Provides structured JSON logging with rotation and performance tracking
+"""
+
+import logging
+import logging.handlers
+import json
+import time
+import os
+import copy
+import queue
+import random
+import threading
+from datetime import datetime
+from pathlib import Path
+from flask import g, has_app_context
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+# Create logs directory if it doesn't exist
+LOGS_DIR = Path("logs")
+LOGS_DIR.mkdir(exist_ok=True)
+
+# Queue mode: request threads only enqueue records; a listener thread formats and writes them
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE", "0") == "1"
+# Records waiting for the listener before new ones are dropped
+LOG_QUEUE_DEPTH = int(os.getenv("LOG_QUEUE_DEPTH", "10000"))
+# Per-logger sampling of INFO and DEBUG lines in queue mode, e.g. "jessica_core=0.1,werkzeug=0.5"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# JSONFormatter encoder backend: "auto" (orjson when installed), "orjson" or "json"
+LOG_JSON_ENCODER = os.getenv("LOG_JSON_ENCODER", "auto")
+
+
+# LogRecord attributes that are not "extra" fields (plus the two JSONFormatter sets itself)
+_RESERVED_RECORD_ATTRS = frozenset(
+    logging.LogRecord('', logging.INFO, '', 0, '', None, None).__dict__
+) | {'message', 'request_id'}
+
+
+def _encode_json(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=str)
+
+
+def _encode_orjson(data: Dict[str, Any]) -> str:
+    try:
+        return orjson.dumps(data, default=str).decode('utf-8')
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, or non-string dict keys
+        return _encode_json(data)
+
+
+# Encoder backends for JSONFormatter: name -> function turning the log dict into a string
+JSON_ENCODERS: Dict[str, Callable[[Dict[str, Any]], str]] = {'json': _encode_json}
+if orjson is not None:
+    JSON_ENCODERS['orjson'] = _encode_orjson
+
+
+def get_json_encoder(name: str = LOG_JSON_ENCODER) -> Callable[[Dict[str, Any]], str]:
+    """
+    Look up a JSON encoder backend
+
+    Args:
+        name: "auto" (orjson when installed, else json) or a key of JSON_ENCODERS
+
+    Returns:
+        Function that encodes a log dictionary as a JSON string
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in JSON_ENCODERS else 'json'
+    try:
+        return JSON_ENCODERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable JSON encoder {name!r} (available: {', '.join(JSON_ENCODERS)})")
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatter that outputs JSON strings
+    Makes logs easily parseable for analysis tools
+    
+    Built for throughput: reserved attribute names are a frozenset (cached
+    per LogRecord class, so record factories that add attributes don't leak
+    them as extras), the timestamp comes from record.created with the
+    date/time prefix reused within the same second, and the encoder is
+    pluggable (orjson when installed).
+    """
+    
+    def __init__(self, *args, encoder: Optional[Callable[[Dict[str, Any]], str]] = None, **kwargs):
+        """
+        Args:
+            encoder: Function encoding the log dictionary (default: get_json_encoder())
+        """
+        super().__init__(*args, **kwargs)
+        self.encode = encoder or get_json_encoder()
+        self._reserved_by_class: Dict[type, frozenset] = {logging.LogRecord: _RESERVED_RECORD_ATTRS}
+        self._timestamp_second = None
+        self._timestamp_prefix = ''
+    
+    def _reserved_attrs(self, record_class: type) -> frozenset:
+        """Attribute names every record of this class carries (computed once per class)"""
+        reserved = self._reserved_by_class.get(record_class)
+        if reserved is None:
+            try:
+                sample = record_class('', logging.INFO, '', 0, '', None, None)
+                reserved = _RESERVED_RECORD_ATTRS | frozenset(sample.__dict__)
+            except Exception:
+                reserved = _RESERVED_RECORD_ATTRS
+            self._reserved_by_class[record_class] = reserved
+        return reserved
+    
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO-8601 timestamp (microseconds) of record.created"""
+        second = int(created)
+        if second != self._timestamp_second:
+            self._timestamp_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+            self._timestamp_second = second
+        return f"{self._timestamp_prefix}.{int((created - second) * 1e6):06d}"
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record as JSON"""
+        # Get request_id from Flask g object or record
+        # (has_app_context() first: a RuntimeError outside Flask costs more than the rest of format())
+        request_id = getattr(record, 'request_id', None)
+        if not request_id:
+            request_id = getattr(g, 'request_id', 'N/A') if has_app_context() else 'N/A'
+        
+        # Build base log structure
+        log_data = {
+            'timestamp': self._timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': request_id,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+        }
+        
+        # Add exception info if present (formatted once per record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_data['exception'] = record.exc_text
+        
+        # Add any extra fields
+        reserved = self._reserved_attrs(type(record))
+        for key, value in record.__dict__.items():
+            if key not in reserved:
+                log_data[key] = value
+        
+        return self.encode(log_data)
+
+
+class HumanReadableFormatter(logging.Formatter):
+    """
+    Formatter for console output that's easier to read
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record for human readability"""
+        # Get request_id
+        request_id = getattr(record, 'request_id', None)
+        if not request_id:
+            try:
+                from flask import g
+                request_id = getattr(g, 'request_id', 'N/A')
+            except (RuntimeError, AttributeError):
+                request_id = 'N/A'
+        
+        # Color codes for different levels
+        colors = {
+            'DEBUG': '\033[36m',    # Cyan
+            'INFO': '\033[32m',     # Green
+            'WARNING': '\033[33m',  # Yellow
+            'ERROR': '\033[31m',    # Red
+            'CRITICAL': '\033[35m', # Magenta
+        }
+        reset_color = '\033[0m'
+        
+        # Get color for this level
+        color = colors.get(record.levelname, '')
+        
+        # Format timestamp
+        timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Build log line
+        log_line = (
+            f"{color}{record.levelname:8s}{reset_color} "
+            f"{timestamp} "
+            f"[{request_id:8s}] "
+            f"{record.name:20s} "
+            f"{record.getMessage()}"
+        )
+        
+        # Add exception if present
+        if record.exc_info:
+            log_line += f"\n{self.formatException(record.exc_info)}"
+        
+        return log_line
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse a LOG_SAMPLE_RATES string
+
+    Args:
+        spec: Comma-separated logger=rate pairs, e.g. "jessica_core=0.1,werkzeug=0.5"
+
+    Returns:
+        Dictionary of logger name -> fraction of INFO/DEBUG records kept
+    """
+    rates = {}
+    for entry in spec.split(','):
+        if not entry.strip():
+            continue
+        name, _, rate = entry.partition('=')
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of INFO and DEBUG records per logger
+
+    A rate set for "jessica_core" also covers "jessica_core.memory"; the
+    longest matching name wins. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.sampled_out = 0
+        self._rate_by_logger: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._rate_by_logger.get(name)
+        if rate is None:
+            rate, matched = 1.0, -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > matched:
+                    rate, matched = prefix_rate, len(prefix)
+            self._rate_by_logger[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class _BlockingStopListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room on a full queue instead of raising"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler feeding a listener thread that owns the real handlers
+
+    The calling thread only resolves the message (and the Flask request_id,
+    which the listener thread cannot see) and puts the record on a bounded
+    queue. When the queue is full the record is dropped and counted rather
+    than blocking the request. The listener starts on the first record.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], max_queue_depth: int = LOG_QUEUE_DEPTH):
+        """
+        Args:
+            handlers: Handlers the listener thread writes to (their levels are respected)
+            max_queue_depth: Maximum records waiting for the listener
+        """
+        super().__init__(queue.Queue(maxsize=max_queue_depth))
+        self.handlers = list(handlers)
+        self.max_queue_depth = max_queue_depth
+        self.listener = _BlockingStopListener(self.queue, *self.handlers, respect_handler_level=True)
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                self.listener.start()
+                self._started = True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pin the message and request_id; formatting is left to the listener"""
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if not hasattr(record, 'request_id'):
+            record.request_id = getattr(g, 'request_id', 'N/A') if has_app_context() else 'N/A'
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # emit() runs under the handler lock, so the counters need no lock of their own
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord):
+        self._ensure_started()
+        super().emit(record)
+
+    def close(self):
+        """Write what is queued and stop the listener thread"""
+        with self._start_lock:
+            if self._started:
+                self.listener.stop()
+                self._started = False
+        if self in _queue_handlers:
+            _queue_handlers.remove(self)
+        super().close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue depth, enqueued/dropped counts and records sampled out
+        """
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'sampled_out': sum(f.sampled_out for f in self.filters if isinstance(f, SamplingFilter)),
+        }
+
+
+# Queue handlers installed by enable_queue_logging (for get_logging_stats)
+_queue_handlers: List[NonBlockingQueueHandler] = []
+
+
+def enable_queue_logging(
+    logger: logging.Logger,
+    max_queue_depth: int = LOG_QUEUE_DEPTH,
+    sample_rates: Optional[Dict[str, float]] = None
+) -> Optional[NonBlockingQueueHandler]:
+    """
+    Move a logger's handlers behind a queue and a listener thread
+
+    Args:
+        logger: Logger whose current handlers should write off the calling thread
+        max_queue_depth: Maximum records waiting before new ones are dropped
+        sample_rates: Logger name -> fraction of INFO/DEBUG records kept
+                      (defaults to LOG_SAMPLE_RATES)
+
+    Returns:
+        The installed queue handler, or None if the logger had no handlers
+    """
+    handlers = list(logger.handlers)
+    if not handlers:
+        return None
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+    queue_handler = NonBlockingQueueHandler(handlers, max_queue_depth)
+    rates = parse_sample_rates(LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    logger.addHandler(queue_handler)
+    _queue_handlers.append(queue_handler)
+    return queue_handler
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """
+    Totals across every queue handler installed by enable_queue_logging
+
+    Returns:
+        Dictionary with queue depth, enqueued/dropped counts and records sampled out
+    """
+    totals = {'queue_depth': 0, 'enqueued': 0, 'dropped': 0, 'sampled_out': 0}
+    for queue_handler in list(_queue_handlers):
+        stats = queue_handler.get_stats()
+        for key in totals:
+            totals[key] += stats[key]
+    return totals
+
+
+def setup_logging(
+    log_level: str = 'INFO',
+    json_logs: bool = True,
+    console_output: bool = True,
+    log_file: Optional[str] = None,
+    use_queue: bool = LOG_QUEUE_ENABLED,
+    sample_rates: Optional[Dict[str, float]] = None
+) -> logging.Logger:
+    """
+    Setup logging configuration for Jessica Core
+    
+    Args:
+        log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        json_logs: Whether to use JSON format for file logs
+        console_output: Whether to output to console
+        log_file: Optional specific log file path (defaults to logs/jessica-core.log)
+        use_queue: Write through a listener thread instead of on the calling thread
+        sample_rates: Per-logger INFO/DEBUG sampling in queue mode (defaults to LOG_SAMPLE_RATES)
+    
+    Returns:
+        Configured logger instance
+    """
+    # Get root logger
+    logger = logging.getLogger('jessica')
+    logger.setLevel(getattr(logging, log_level.upper()))
+    for handler in list(logger.handlers):
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.close()
+    logger.handlers.clear()
+    
+    # Console handler (human-readable)
+    if console_output:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(HumanReadableFormatter())
+        logger.addHandler(console_handler)
+    
+    # File handler with rotation (JSON format)
+    if log_file is None:
+        log_file = LOGS_DIR / 'jessica-core.log'
+    
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=10 * 1024 * 1024,  # 10 MB
+        backupCount=10,  # Keep 10 old files
+        encoding='utf-8'
+    )
+    file_handler.setLevel(logging.DEBUG)
+    
+    if json_logs:
+        file_handler.setFormatter(JSONFormatter())
+    else:
+        file_handler.setFormatter(HumanReadableFormatter())
+    
+    logger.addHandler(file_handler)
+    
+    # Error file handler (separate file for errors only)
+    error_handler = logging.handlers.RotatingFileHandler(
+        LOGS_DIR / 'jessica-errors.log',
+        maxBytes=10 * 1024 * 1024,  # 10 MB
+        backupCount=5,
+        encoding='utf-8'
+    )
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(JSONFormatter() if json_logs else HumanReadableFormatter())
+    logger.addHandler(error_handler)
+    
+    if use_queue:
+        enable_queue_logging(logger, sample_rates=sample_rates)
+    
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a child logger for a specific module
+    
+    Args:
+        name: Module name
+    
+    Returns:
+        Logger instance
+    """
+    return logging.getLogger(f'jessica.{name}')
+